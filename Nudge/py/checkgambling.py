@@ -1,20 +1,41 @@
 import sys
 import dotenv
 import os
-import google.generativeai as genai
+import re
+import json
+import time
+import threading
+from lazy_import import LazyModule
 import argparse
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
 
-def configure_gemini():
+genai = LazyModule("google.generativeai")  # imported on first use
+GAMBLING_MODEL = 'gemini-1.5-flash-latest'
+# URLs classified per prompt, and how long a coalesced call waits for others to join its batch.
+GAMBLING_BATCH_SIZE = int(os.getenv("GAMBLING_BATCH_SIZE", "20"))
+GAMBLING_BATCH_WAIT = float(os.getenv("GAMBLING_BATCH_WAIT", "0.02"))
+CLASSIFICATION_FAILED = "Something prolly went wrong"
+
+def configure_gemini(api_key: Optional[str] = None, endpoint: Optional[str] = None):
+    """
+    Configures the Gemini client. GEMINI_API_ENDPOINT (or `endpoint`) points it at another
+    server over REST, e.g. a local fake model endpoint.
+    """
     dotenv.load_dotenv()
-    api_key = os.getenv("GEMINI_API_KEY")
-    genai.configure(api_key=api_key)
+    api_key = api_key or os.getenv("GEMINI_API_KEY")
+    endpoint = endpoint or os.getenv("GEMINI_API_ENDPOINT")
+    if endpoint:
+        genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": endpoint})
+    else:
+        genai.configure(api_key=api_key)
 
 
 def checkgambling(url: str) -> int | None:
 
     # Using a faster/cheaper model suitable for classification tasks.
     # You could also use 'gemini-pro' or other models.
-    model = genai.GenerativeModel('gemini-1.5-flash-latest')
+    model = genai.GenerativeModel(GAMBLING_MODEL)
 
     # Construct a precise prompt asking for a binary classification (0 or 1)
     # Emphasize the output format strictly.
@@ -47,7 +68,163 @@ def checkgambling(url: str) -> int | None:
 
         print(f"Warning: Unexpected response format from Gemini API for {url}: '{result_text}'. Expected '1' or '0'.", file=sys.stderr)
 
-        return "Something prolly went wrong" 
+        return CLASSIFICATION_FAILED
+
+
+def build_batch_prompt(urls: List[str]) -> str:
+    listing = "\n".join(f"{number}. {url}" for number, url in enumerate(urls, 1))
+    return f"""
+    Analyze the websites accessible at the following numbered URLs:
+    {listing}
+
+    For each one, decide whether the primary purpose of the website is related to gambling activities.
+    Gambling activities include, but are not limited to: online casinos,
+    sports betting, poker sites, lottery sites, bingo sites, or sites
+    offering games of chance for money.
+
+    Respond with ONLY a JSON array containing one object per URL, in the same order, like
+    [{{"id": 1, "gambling": 1}}, {{"id": 2, "gambling": 0}}]
+    where "gambling" is 1 if YES (it is primarily a gambling website) and 0 if NO.
+    Do not provide any explanation, reasoning, or additional text.
+    """
+
+
+def parse_batch_reply(text: str, urls: List[str]) -> Dict[str, bool]:
+    """
+    Reads the model's JSON reply for `urls`. Returns {url: verdict} for the entries that are
+    well formed; URLs that are missing, malformed or answered twice inconsistently are left out.
+    """
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    try:
+        reply = json.loads(text)
+    except ValueError:
+        return {}
+    if isinstance(reply, dict):
+        reply = [{"id": key, "gambling": value} for key, value in reply.items()]
+    if not isinstance(reply, list):
+        return {}
+    verdicts: Dict[str, bool] = {}
+    conflicting = set()
+    for entry in reply:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            number = int(entry.get("id"))
+        except (TypeError, ValueError):
+            continue
+        value = entry.get("gambling")
+        if not 1 <= number <= len(urls) or value not in (0, 1, "0", "1"):
+            continue
+        url = urls[number - 1]
+        verdict = value in (1, "1")
+        if verdicts.get(url, verdict) != verdict:
+            conflicting.add(url)
+        verdicts[url] = verdict
+    return {url: verdict for url, verdict in verdicts.items() if url not in conflicting}
+
+
+def checkgambling_batch(urls: List[str], batch_size: int = GAMBLING_BATCH_SIZE, model=None) -> Dict[str, object]:
+    """
+    Classifies many URLs with one prompt per `batch_size` of them. URLs the batch reply does not
+    answer cleanly fall back to checkgambling(); one whose fallback fails maps to CLASSIFICATION_FAILED.
+    """
+    model = model or genai.GenerativeModel(GAMBLING_MODEL)
+    unique_urls = list(dict.fromkeys(urls))
+    results: Dict[str, object] = {}
+    for start in range(0, len(unique_urls), max(1, batch_size)):
+        batch = unique_urls[start:start + max(1, batch_size)]
+        try:
+            response = model.generate_content(build_batch_prompt(batch),
+                                              generation_config={"response_mime_type": "application/json"})
+            verdicts = parse_batch_reply(response.text, batch)
+        except Exception as e:
+            print(f"Warning: batch gambling check of {len(batch)} URLs failed: {e}", file=sys.stderr)
+            verdicts = {}
+        for url in batch:
+            if url in verdicts:
+                results[url] = verdicts[url]
+                continue
+            try:
+                results[url] = checkgambling(url)
+            except Exception as e:
+                print(f"Warning: gambling check for {url} failed: {e}", file=sys.stderr)
+                results[url] = CLASSIFICATION_FAILED
+    return results
+
+
+class GamblingBatcher:
+    """
+    Coalesces concurrent single-URL checks: check(url) joins the pending batch, which is sent
+    through `classify` (checkgambling_batch by default) once it holds `batch_size` URLs or
+    `max_wait` seconds after its first URL arrived, whichever comes first.
+    """
+
+    def __init__(self, batch_size: int = GAMBLING_BATCH_SIZE, max_wait: float = GAMBLING_BATCH_WAIT,
+                 classify: Optional[Callable[[List[str]], Dict[str, object]]] = None):
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait
+        self.classify = classify or (lambda urls: checkgambling_batch(urls, self.batch_size))
+        self._pending: Dict[str, List[Future]] = {}
+        self._first_arrival = None
+        self._cond = threading.Condition()
+        self._worker = None
+
+    def submit(self, url: str) -> Future:
+        future: Future = Future()
+        with self._cond:
+            if not self._pending:
+                self._first_arrival = time.monotonic()
+            self._pending.setdefault(url, []).append(future)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._collect, name="gambling-batcher", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        return future
+
+    def check(self, url: str, timeout: Optional[float] = None):
+        return self.submit(url).result(timeout)
+
+    def _collect(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                while len(self._pending) < self.batch_size:
+                    remaining = self._first_arrival + self.max_wait - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                urls = list(self._pending)[:self.batch_size]
+                batch = {url: self._pending.pop(url) for url in urls}
+                if self._pending:
+                    self._first_arrival = time.monotonic()
+            # Classify on its own thread so the next batch can fill and go out meanwhile.
+            threading.Thread(target=self._classify, args=(batch,), daemon=True).start()
+
+    def _classify(self, batch: Dict[str, List[Future]]):
+        try:
+            results = self.classify(list(batch))
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+        for url, futures in batch.items():
+            for future in futures:
+                future.set_result(results.get(url, CLASSIFICATION_FAILED))
+
+
+_default_batcher: Optional[GamblingBatcher] = None
+_default_batcher_lock = threading.Lock()
+
+
+def checkgambling_coalesced(url: str):
+    """checkgambling() for concurrent callers: their URLs are classified together in batches."""
+    global _default_batcher
+    with _default_batcher_lock:
+        if _default_batcher is None:
+            _default_batcher = GamblingBatcher()
+    return _default_batcher.check(url)
 
 # --- Main Execution ---
 if __name__ == "__main__":
@@ -1,33 +1,90 @@
 import requests
-import json
+import asyncio
+import threading
 import urllib.parse
 import dotenv
 import os
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 #import openai
 
 dotenv.load_dotenv()
 
+IPQS_BASE_URL = os.getenv("IPQS_BASE_URL", "https://www.ipqualityscore.com/api/json/url")
+IPQS_CONNECT_TIMEOUT = float(os.getenv("IPQS_CONNECT_TIMEOUT", "3.05"))
+IPQS_READ_TIMEOUT = float(os.getenv("IPQS_READ_TIMEOUT", "5"))
+# Retries after the first attempt, on connection errors, 429 and 5xx responses.
+IPQS_RETRIES = int(os.getenv("IPQS_RETRIES", "2"))
+# Sleep between retries is backoff * 2 ** (retry - 1) seconds, unless the server sends Retry-After.
+IPQS_BACKOFF = float(os.getenv("IPQS_BACKOFF", "0.3"))
+# Keep-alive connections held per host; concurrent callers beyond this open short-lived extras.
+IPQS_POOL_SIZE = int(os.getenv("IPQS_POOL_SIZE", "10"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class IPQSError(Exception):
+    """IPQS answered, but not with a usable result (e.g. "success": false for a bad key or quota)."""
+
+
+def make_session(retries: int = IPQS_RETRIES, backoff: float = IPQS_BACKOFF,
+                 pool_size: int = IPQS_POOL_SIZE) -> requests.Session:
+    """A requests session with a keep-alive connection pool and bounded retries with backoff."""
+    retry = Retry(total=retries, connect=retries, read=retries, status=retries, backoff_factor=backoff,
+                  status_forcelist=RETRY_STATUSES, allowed_methods=["GET"], respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
 class IPQS:
     key = os.getenv('IPQS_Key')
-    
+    _shared_session = None
+    _session_lock = threading.Lock()
+
+    def __init__(self, key: str = None, base_url: str = None, session: requests.Session = None,
+                 connect_timeout: float = IPQS_CONNECT_TIMEOUT, read_timeout: float = IPQS_READ_TIMEOUT):
+        if key is not None:
+            self.key = key
+        self.base_url = (base_url or IPQS_BASE_URL).rstrip("/")
+        self.session = session or self.shared_session()
+        self.timeout = (connect_timeout, read_timeout)
+
+    @classmethod
+    def shared_session(cls) -> requests.Session:
+        """One pooled session per process, so every check reuses warm keep-alive connections."""
+        with cls._session_lock:
+            if cls._shared_session is None:
+                cls._shared_session = make_session()
+            return cls._shared_session
+
     def checkscam(self, url: str, vars: dict = {}) -> dict:
-    
-        api_url = 'https://www.ipqualityscore.com/api/json/url/%s/%s' % (self.key, urllib.parse.quote_plus(url))
-        response = requests.get(api_url, params=vars)
-        
+        """
+        Looks `url` up with IPQS. Raises requests exceptions on timeouts, on connection errors
+        and on error statuses once retries are used up, and IPQSError on an unsuccessful reply.
+        """
+        api_url = '%s/%s/%s' % (self.base_url, self.key, urllib.parse.quote_plus(url))
+        response = self.session.get(api_url, params=vars, timeout=self.timeout)
+        response.raise_for_status()
 
-        result = json.loads(response.text)
-        
+        result = response.json()
+        if result.get("success") is False:
+            raise IPQSError(result.get("message", "IPQS request was not successful"))
 
         output = {"unsafe": result.get("unsafe", False)}
-        
+
 
         for field in ["spamming", "malware", "phishing", "suspicious"]:
             if result.get(field, False):
                 output[field] = True
-        
+
         return output
 
+    async def checkscam_async(self, url: str, vars: dict = {}) -> dict:
+        """checkscam() for asyncio callers, run on a worker thread over the same pooled session."""
+        return await asyncio.to_thread(self.checkscam, url, vars)
+
 if __name__ == "__main__":
 
     URL = 'google.com' #test a sus website
@@ -37,8 +94,8 @@ if __name__ == "__main__":
         'strictness': strictness,
         'fast': 1
     }
-    
+
     ipqs = IPQS()
     result = ipqs.checkscam(URL, additional_params)
-    
+
     print(result)
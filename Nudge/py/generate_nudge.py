@@ -1,10 +1,116 @@
 import sys
 import dotenv
 import os
-import google.generativeai as genai
-from typing import Dict, Any, Optional
+import time
+import threading
+from lazy_import import LazyModule
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Any, Optional, Tuple
 from checkscam import IPQS # Assuming IPQS class is in checkscam.py
-from checkgambling import checkgambling # Assuming function is in checkgambling.py
+from checkgambling import checkgambling_coalesced # Concurrent nudges share one batched Gemini call
+from verdict_cache import VerdictCache
+from url_prefilter import UrlPrefilter
+from nudge_messages import MessageCache
+
+genai = LazyModule("google.generativeai")  # imported on first use
+
+# Each check gets its own deadline; one that misses it counts as "Unknown" instead of blocking.
+SCAM_CHECK_TIMEOUT = float(os.getenv("SCAM_CHECK_TIMEOUT", "3"))
+GAMBLING_CHECK_TIMEOUT = float(os.getenv("GAMBLING_CHECK_TIMEOUT", "4"))
+# Overall budget for a nudge, checks and message included, so the warning shows while it matters.
+NUDGE_BUDGET = float(os.getenv("NUDGE_BUDGET", "6"))
+
+_verdict_cache: Optional[VerdictCache] = None
+_prefilter: Optional[UrlPrefilter] = None
+_message_cache: Optional[MessageCache] = None
+
+
+def get_verdict_cache() -> VerdictCache:
+    """The process-wide verdict cache, opened on first use."""
+    global _verdict_cache
+    if _verdict_cache is None:
+        _verdict_cache = VerdictCache()
+    return _verdict_cache
+
+
+def get_prefilter() -> UrlPrefilter:
+    """The process-wide local pre-filter, loaded from KNOWN_DOMAINS_FILE on first use."""
+    global _prefilter
+    if _prefilter is None:
+        _prefilter = UrlPrefilter.from_file()
+    return _prefilter
+
+
+def get_message_cache() -> MessageCache:
+    """The process-wide nudge message cache, loaded from disk and pre-warmed in the background on first use."""
+    global _message_cache
+    if _message_cache is None:
+        _message_cache = MessageCache()
+        _message_cache.warm()
+    return _message_cache
+
+
+def completed(result: Any) -> Future:
+    future: Future = Future()
+    future.set_result(result)
+    return future
+
+
+def start_check(check: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """
+    Runs check(*args, **kwargs) on a daemon thread and returns a Future for its result. Daemon
+    threads rather than an executor, so a remote call that never returns cannot hold up exit.
+    """
+    future: Future = Future()
+
+    def run():
+        try:
+            future.set_result(check(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=f"nudge-{getattr(check, '__name__', 'check')}", daemon=True).start()
+    return future
+
+
+def wait_for(future: Future, deadline: float, label: str, url: str) -> Tuple[bool, Any]:
+    """Returns (True, result) if `future` finishes by `deadline` (a perf_counter time), else (False, None)."""
+    try:
+        return True, future.result(timeout=max(0.0, deadline - time.perf_counter()))
+    except FutureTimeout:
+        print(f"Warning: {label} for {url} missed its deadline.", file=sys.stderr)
+    except Exception as e:
+        print(f"Warning: {label} for {url} failed: {e}", file=sys.stderr)
+    return False, None
+
+
+def run_checks(url: str, cache: VerdictCache, scam_timeout: float, gambling_timeout: float,
+               deadline: float, prefilter: Optional[UrlPrefilter] = None) -> Tuple[Optional[Dict[str, bool]], Any]:
+    """
+    Answers what the local pre-filter can decide, and runs the remaining scam and gambling checks
+    concurrently, each bounded by its own timeout and by the overall `deadline`. Returns
+    (scam_results, gambling_result), with None for a check that did not finish or was not needed.
+    A check that finishes late still fills the cache for the next visit.
+    """
+    start = time.perf_counter()
+    decision = (prefilter or get_prefilter()).classify(url)
+    if decision.scam is not None:
+        scam_future = completed(decision.scam)
+    else:
+        scam_checker = IPQS()
+        scam_future = start_check(cache.get_or_check, "scam", url, scam_checker.checkscam,
+                                  lambda verdict: isinstance(verdict, dict))
+    if decision.gambling is not None:
+        gambling_future = completed(decision.gambling)
+    elif decision.scam and decision.scam.get("unsafe"):
+        # The nudge leads with the security flags and leaves out an unknown gambling status.
+        gambling_future = completed(None)
+    else:
+        gambling_future = start_check(cache.get_or_check, "gambling", url, checkgambling_coalesced,
+                                      lambda verdict: isinstance(verdict, bool))
+    _, scam_results = wait_for(scam_future, min(start + scam_timeout, deadline), "Scam check", url)
+    _, gambling_result = wait_for(gambling_future, min(start + gambling_timeout, deadline), "Gambling check", url)
+    return scam_results, gambling_result
 
 
 def configure_gemini():
@@ -13,10 +119,15 @@ def configure_gemini():
     genai.configure(api_key=api_key)
 
 
-def generate_nudge(url: str) -> Optional[str]:
-    scam_checker = IPQS()
-    scam_results = scam_checker.checkscam(url)
-    gambling_result = checkgambling(url)
+def generate_nudge(url: str, cache: Optional[VerdictCache] = None, budget: float = NUDGE_BUDGET,
+                   scam_timeout: float = SCAM_CHECK_TIMEOUT, gambling_timeout: float = GAMBLING_CHECK_TIMEOUT,
+                   prefilter: Optional[UrlPrefilter] = None, messages: Optional[MessageCache] = None) -> Optional[str]:
+    # Verdicts are cached per registrable domain, so repeat visits skip IPQS and Gemini.
+    # Errors (an exception, or a non-boolean gambling reply) are never cached.
+    cache = cache or get_verdict_cache()
+    deadline = time.perf_counter() + budget
+    scam_results, gambling_result = run_checks(url, cache, scam_timeout, gambling_timeout, deadline, prefilter)
+    scam_results = scam_results or {}
 
 
 
@@ -36,53 +147,10 @@ def generate_nudge(url: str) -> Optional[str]:
     if gambling_result is None or isinstance(gambling_result, str):
          gambling_status = "Unknown" # Handle error/uncertainty case
 
-    threat_summary = "None"
-    if detected_threats:
-        # Format threats nicely, e.g., "Unsafe, Phishing, Malware"
-        threat_summary = ", ".join(sorted(list(threat_threat.capitalize() for threat_threat in detected_threats)))
-
-    # --- Construct the Prompt ---
-    prompt = f"""
-    Context:
-    - Website URL: {url}
-    - Primary Activity Identified as Gambling: {gambling_status}
-    - Detected Security Flags: {threat_summary}
-
-    Task:
-    Generate a brief, user-friendly nudge message (1-2 sentences max) for a web user based *only* on the context above.
-
-    Instructions for the nudge:
-    - Purpose: To make the user aware of potential risks without causing panic or being overly technical. It's a gentle 'heads-up'.
-    - Tone: Cautious, helpful, simple language.
-    - Content Priority:
-        1. If security flags (like unsafe, spamming, malware, phishing, suspicious) are detected, the nudge *must* focus on warning about these risks and advise caution or avoidance. Mentioning gambling is secondary or omitted if security flags are present.
-        2. If *only* gambling is identified (no security flags), the nudge should mention it looks like a gambling site and advise caution, especially regarding financial activity.
-        3. If gambling status is Unknown but security flags exist, focus only on the security flags.
-    - Do NOT: Mention the specific tools used (like IPQS or Gemini), use jargon, or output anything other than the nudge message itself.
-
-    Generate the nudge message now:
-    """
-
-
-    try:
-        model = genai.GenerativeModel('gemini-1.5-flash-latest')
-
-
-        response = model.generate_content(prompt)
-
-        # --- Process Response ---
-        nudge_message = response.text.strip()
-
-        if not nudge_message:
-             print(f"Warning: Gemini returned an empty response for nudge generation for {url}.", file=sys.stderr)
-             return None 
-
-        return nudge_message
-
-    except Exception as e:
-        print(f"Error during Gemini API call for nudge generation ({url}): {e}", file=sys.stderr)
-        
-        return None # Indicate failure to generate nudge
+    # The message depends only on the gambling status and the threat flags, so it comes from the
+    # message cache; a missing one gets what is left of the budget, then a local template.
+    messages = messages or get_message_cache()
+    return messages.message(gambling_status, detected_threats, deadline - time.perf_counter())
 
 
 if __name__ == '__main__':
@@ -156,4 +224,7 @@ if __name__ == '__main__':
     if nudge:
         print(f"Nudge Generated: {nudge}")
     else:
-        print("No nudge generated (or error occurred).")
\ No newline at end of file
+        print("No nudge generated (or error occurred).")
+    print(f"Verdict cache: {get_verdict_cache().stats()}", file=sys.stderr)
+    print(f"Pre-filter: {get_prefilter().stats()}", file=sys.stderr)
+    print(f"Nudge messages: {get_message_cache().stats()}", file=sys.stderr)
\ No newline at end of file
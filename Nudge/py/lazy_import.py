@@ -0,0 +1,39 @@
+import importlib
+import threading
+from types import ModuleType
+
+
+class LazyModule:
+    """
+    Stands in for a module that is slow to import (google.generativeai takes most of a nudge
+    script's startup) and imports it on first attribute access. Attribute writes go to the real
+    module, so every LazyModule for the same name, and a plain import of it, share one module.
+    """
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def load(self) -> ModuleType:
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    object.__setattr__(self, "_module", importlib.import_module(self._name))
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self.load(), attr)
+
+    def __setattr__(self, attr: str, value) -> None:
+        setattr(self.load(), attr, value)
+
+    def __delattr__(self, attr: str) -> None:
+        delattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        return f"<LazyModule {self._name!r}{'' if self.loaded else ' (not imported)'}>"
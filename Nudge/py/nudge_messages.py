@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import threading
+from lazy_import import LazyModule
+from itertools import combinations
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+genai = LazyModule("google.generativeai")  # imported on first use
+MESSAGE_MODEL = 'gemini-1.5-flash-latest'
+# Persisted messages; set NUDGE_MESSAGE_CACHE to an empty string to keep them in memory only.
+MESSAGE_CACHE_FILE = os.getenv("NUDGE_MESSAGE_CACHE",
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), "nudge_messages.json"))
+# Bound on one model call. A request waits only for what is left of its nudge budget, but the call
+# runs on to this timeout so a late message is still stored for the next nudge.
+MESSAGE_TIMEOUT = float(os.getenv("NUDGE_MESSAGE_TIMEOUT", "20"))
+GAMBLING_STATUSES = ("Yes", "No", "Unknown")
+THREAT_FLAGS = ("unsafe", "spamming", "malware", "phishing", "suspicious")
+
+
+def message_key(gambling_status: str, threats: Iterable[str]) -> str:
+    """The cache key of a combination, e.g. "No|phishing,unsafe"."""
+    return f"{gambling_status}|{','.join(sorted(threats))}"
+
+
+def nudge_combinations() -> Iterator[Tuple[str, frozenset]]:
+    """Every (gambling status, threat flags) combination that gets a nudge: 94 of them."""
+    for status in GAMBLING_STATUSES:
+        for count in range(len(THREAT_FLAGS) + 1):
+            for threats in combinations(THREAT_FLAGS, count):
+                if threats or status == "Yes":
+                    yield status, frozenset(threats)
+
+
+def build_prompt(gambling_status: str, threats: Iterable[str]) -> str:
+    threat_summary = ", ".join(sorted(threat.capitalize() for threat in threats)) or "None"
+    return f"""
+    Context:
+    - Primary Activity Identified as Gambling: {gambling_status}
+    - Detected Security Flags: {threat_summary}
+
+    Task:
+    Generate a brief, user-friendly nudge message (1-2 sentences max) for a web user based *only* on the context above.
+
+    Instructions for the nudge:
+    - Purpose: To make the user aware of potential risks without causing panic or being overly technical. It's a gentle 'heads-up'.
+    - Tone: Cautious, helpful, simple language.
+    - Content Priority:
+        1. If security flags (like unsafe, spamming, malware, phishing, suspicious) are detected, the nudge *must* focus on warning about these risks and advise caution or avoidance. Mentioning gambling is secondary or omitted if security flags are present.
+        2. If *only* gambling is identified (no security flags), the nudge should mention it looks like a gambling site and advise caution, especially regarding financial activity.
+        3. If gambling status is Unknown but security flags exist, focus only on the security flags.
+    - Do NOT: Mention the specific tools used (like IPQS or Gemini), mention the website's name or address, use jargon, or output anything other than the nudge message itself.
+
+    Generate the nudge message now:
+    """
+
+
+def template_message(gambling_status: str, threats: Iterable[str]) -> str:
+    """A local message for when the model is slow or unavailable, led by the most serious flag."""
+    threats = set(threats)
+    if "malware" in threats:
+        return "Heads up: this site has been flagged for malware. Avoid downloading anything or entering personal details here."
+    if "phishing" in threats:
+        return "Heads up: this site has been flagged for phishing. Don't enter passwords, personal or payment details here."
+    if threats - {"spamming"}:
+        return "Heads up: this site has been flagged as potentially unsafe. Avoid entering personal or payment details."
+    if threats:
+        return "Heads up: this site has been linked to spam. Be careful about sharing your email or contact details."
+    return "Heads up: this looks like a gambling site. Be careful with any money you spend here."
+
+
+def gemini_message(prompt: str, timeout: float = MESSAGE_TIMEOUT) -> str:
+    model = genai.GenerativeModel(MESSAGE_MODEL)
+    response = model.generate_content(prompt, request_options={"timeout": timeout})
+    return response.text.strip()
+
+
+class MessageCache:
+    """
+    Nudge messages per (gambling status, threat flags) combination, the only inputs a message
+    depends on. Held in memory and saved as JSON at `path`. A combination without a message is
+    composed once with `compose(prompt, timeout)` (Gemini by default), however many nudges ask.
+    """
+
+    def __init__(self, path: Optional[str] = MESSAGE_CACHE_FILE,
+                 compose: Callable[[str, float], str] = gemini_message):
+        self.path = path
+        self.compose = compose
+        self._messages: Dict[str, str] = {}
+        self._pending: Dict[str, Future] = {}
+        self._stats = {"hits": 0, "misses": 0, "composed": 0, "templates": 0}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._messages = {key: message for key, message in json.load(f).items() if message}
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not load nudge messages from {path}: {e}", file=sys.stderr)
+
+    def get(self, gambling_status: str, threats: Iterable[str]) -> Optional[str]:
+        with self._lock:
+            return self._messages.get(message_key(gambling_status, threats))
+
+    def put(self, gambling_status: str, threats: Iterable[str], message: str) -> None:
+        with self._lock:
+            self._messages[message_key(gambling_status, threats)] = message
+            self._save()
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._messages, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not save nudge messages to {self.path}: {e}", file=sys.stderr)
+
+    def compose_async(self, gambling_status: str, threats: Iterable[str]) -> Future:
+        """
+        Composes and stores the message for a combination on a daemon thread. Concurrent callers
+        for the same combination share one model call. The Future's result is the message, or "".
+        """
+        threats = frozenset(threats)
+        key = message_key(gambling_status, threats)
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            future: Future = Future()
+            self._pending[key] = future
+
+        def run():
+            try:
+                message = self.compose(build_prompt(gambling_status, threats), MESSAGE_TIMEOUT).strip()
+                if message:
+                    self.put(gambling_status, threats, message)
+                    with self._lock:
+                        self._stats["composed"] += 1
+                future.set_result(message)
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+
+        threading.Thread(target=run, name="nudge-message", daemon=True).start()
+        return future
+
+    def message(self, gambling_status: str, threats: Iterable[str], timeout: float) -> str:
+        """
+        The cached message for a combination. On a miss, waits up to `timeout` seconds for the
+        model, then falls back to template_message(); a late message is still stored.
+        """
+        threats = frozenset(threats)
+        cached = self.get(gambling_status, threats)
+        with self._lock:
+            self._stats["hits" if cached else "misses"] += 1
+        if cached:
+            return cached
+        try:
+            message = self.compose_async(gambling_status, threats).result(timeout=max(0.0, timeout))
+            if message:
+                return message
+            print(f"Warning: Gemini returned an empty nudge message for {message_key(gambling_status, threats)}.",
+                  file=sys.stderr)
+        except FutureTimeout:
+            print(f"Warning: Nudge message for {message_key(gambling_status, threats)} missed its deadline.",
+                  file=sys.stderr)
+        except Exception as e:
+            print(f"Warning: Nudge message for {message_key(gambling_status, threats)} failed: {e}", file=sys.stderr)
+        with self._lock:
+            self._stats["templates"] += 1
+        return template_message(gambling_status, threats)
+
+    def warm(self) -> threading.Thread:
+        """
+        Composes every missing combination, one call at a time, on a background thread. Stops at
+        the first failure, leaving the rest to be composed on demand.
+        """
+
+        def run():
+            for gambling_status, threats in nudge_combinations():
+                if self.get(gambling_status, threats) is not None:
+                    continue
+                try:
+                    self.compose_async(gambling_status, threats).result()
+                except Exception as e:
+                    print(f"Warning: Stopped pre-warming nudge messages at {message_key(gambling_status, threats)}: {e}",
+                          file=sys.stderr)
+                    return
+
+        thread = threading.Thread(target=run, name="nudge-message-warm", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cached"] = len(self._messages)
+        stats["combinations"] = sum(1 for _ in nudge_combinations())
+        return stats
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Long-running nudge service. The Gemini client, the pooled IPQS session, the verdict and message
+caches and the gambling batcher stay warm across requests, instead of being rebuilt by every
+one-shot script run. google.generativeai is imported on first use, after the port is open.
+
+    python nudge_server.py serve --port 8766
+    python nudge_server.py bench --urls casino.example.com,news.example.com --requests 20
+
+GET /nudge?url=<url>      {"url": ..., "nudge": <message or null>}
+GET /scam?url=<url>       {"url": ..., "flags": {"unsafe": ..., ...}}
+GET /gambling?url=<url>   {"url": ..., "gambling": true | false}
+GET /health               cache, pre-filter and message statistics
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import threading
+import subprocess
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+import generate_nudge
+from checkscam import IPQS
+from checkgambling import checkgambling_coalesced, configure_gemini
+
+NUDGE_HOST = os.getenv("NUDGE_HOST", "127.0.0.1")
+NUDGE_PORT = int(os.getenv("NUDGE_PORT", "8766"))
+NUDGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_gemini_configured = False
+_gemini_lock = threading.Lock()
+
+
+class CheckFailed(Exception):
+    """A remote check failed or gave no usable verdict."""
+
+
+def check_scam(url: str) -> dict:
+    """IPQS flags for `url`, through the process-wide verdict cache."""
+    return generate_nudge.get_verdict_cache().get_or_check(
+        "scam", url, IPQS().checkscam, lambda verdict: isinstance(verdict, dict))
+
+
+def check_gambling(url: str) -> bool:
+    """The gambling verdict for `url`, through the verdict cache and the coalescing batcher."""
+    verdict = generate_nudge.get_verdict_cache().get_or_check(
+        "gambling", url, checkgambling_coalesced, lambda verdict: isinstance(verdict, bool))
+    if not isinstance(verdict, bool):
+        raise CheckFailed(f"could not classify {url}")
+    return verdict
+
+
+def ensure_gemini() -> None:
+    """Configures the Gemini client once per process; the first call pays for importing it."""
+    global _gemini_configured
+    with _gemini_lock:
+        if not _gemini_configured:
+            configure_gemini()
+            _gemini_configured = True
+
+
+def warm_up() -> None:
+    """Imports and configures the Gemini client, then pre-warms the nudge messages."""
+    start = time.perf_counter()
+    ensure_gemini()
+    generate_nudge.get_message_cache()
+    print(f"Gemini client ready in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+# ----- HTTP ENDPOINT -----
+ROUTES = {
+    "/nudge": lambda url: {"url": url, "nudge": generate_nudge.generate_nudge(url)},
+    "/scam": lambda url: {"url": url, "flags": check_scam(url)},
+    "/gambling": lambda url: {"url": url, "gambling": check_gambling(url)},
+}
+
+
+class NudgeHandler(BaseHTTPRequestHandler):
+    """Answers the routes above with JSON; 400 on a bad request, 502 when a remote check fails."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            return self.send_json(200, {
+                "verdicts": generate_nudge.get_verdict_cache().stats(),
+                "prefilter": generate_nudge.get_prefilter().stats(),
+                "messages": generate_nudge.get_message_cache().stats(),
+            })
+        target = parse_qs(url.query).get("url")
+        if url.path not in ROUTES or not target:
+            return self.send_json(400, {"message": f"Use {', '.join(f'{path}?url=<url>' for path in ROUTES)}."})
+        try:
+            if url.path != "/scam":
+                ensure_gemini()
+            payload = ROUTES[url.path](target[0])
+        except Exception as e:
+            return self.send_json(502, {"url": target[0], "message": f"Check failed: {e}"})
+        self.send_json(200, payload)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host=NUDGE_HOST, port=NUDGE_PORT):
+    server = ThreadingHTTPServer((host, port), NudgeHandler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(args):
+    """Opens the port first, so callers can connect while the Gemini client warms up behind it."""
+    server = make_server(args.host, args.port)
+    print(f"Serving nudges on http://{args.host}:{server.server_address[1]}", flush=True)
+    if not args.no_warm:
+        threading.Thread(target=warm_up, name="nudge-warm-up", daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down nudge server.")
+    finally:
+        server.server_close()
+
+
+# ----- BENCHMARK -----
+ONE_SHOT_NUDGE = (
+    "import sys, checkgambling, generate_nudge; checkgambling.configure_gemini(); "
+    "print(generate_nudge.generate_nudge(sys.argv[1]))"
+)
+
+
+def summarize(label, seconds):
+    ordered = sorted(seconds)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<28} n={len(ordered):<4} median {statistics.median(ordered) * 1000:>9.1f} ms"
+          f"  p95 {p95 * 1000:>9.1f} ms")
+
+
+def bench(args):
+    """
+    Compares a process per nudge, as the scripts run today, with requests to a running service,
+    both sequential and concurrent. Runs against whatever IPQS_BASE_URL and GEMINI_API_ENDPOINT
+    point at, with the same verdict and message caches. Each mode gets its own slice of the URLs,
+    so give processes + 2 * requests distinct domains to time uncached checks throughout.
+    """
+    urls = [url for url in args.urls.split(",") if url]
+    targets = [urls[number % len(urls)] for number in range(args.processes + 2 * args.requests)]
+    process_targets = targets[:args.processes]
+    sequential_targets = targets[args.processes:args.processes + args.requests]
+    concurrent_targets = targets[args.processes + args.requests:]
+
+    process_seconds = []
+    for url in process_targets:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", ONE_SHOT_NUDGE, url], cwd=NUDGE_DIR, check=False,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        process_seconds.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    service = subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve", "--port", "0"],
+                               cwd=NUDGE_DIR, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        base_url = service.stdout.readline().strip().rsplit(" ", 1)[-1]
+        startup = time.perf_counter() - start
+
+        def request(url):
+            began = time.perf_counter()
+            with urllib.request.urlopen(f"{base_url}/nudge?url={quote(url)}", timeout=60) as response:
+                response.read()
+            return time.perf_counter() - began
+
+        first = request(sequential_targets[0])
+        sequential = [request(url) for url in sequential_targets[1:]]
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            concurrent = list(pool.map(request, concurrent_targets))
+    finally:
+        service.terminate()
+        service.wait()
+
+    print(f"{'service startup (port open)':<28} {startup * 1000:>16.1f} ms")
+    print(f"{'service first request':<28} {first * 1000:>16.1f} ms")
+    summarize("process per nudge", process_seconds)
+    summarize("service, sequential", sequential)
+    summarize(f"service, {args.concurrency} concurrent", concurrent)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Long-running nudge, scam and gambling checks.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="serve the checks over HTTP")
+    serve_parser.add_argument("--host", default=NUDGE_HOST, help="bind address (default: %(default)s)")
+    serve_parser.add_argument("--port", type=int, default=NUDGE_PORT, help="port, 0 for any (default: %(default)s)")
+    serve_parser.add_argument("--no-warm", action="store_true",
+                              help="configure Gemini on the first request instead of at startup")
+    serve_parser.set_defaults(func=serve)
+    bench_parser = subparsers.add_parser("bench", help="process-per-nudge vs service latency")
+    bench_parser.add_argument("--urls", default="https://www.betmgm.com,https://example.com,apple.com",
+                              help="comma-separated URLs to cycle through (default: %(default)s)")
+    bench_parser.add_argument("--requests", type=int, default=20, help="service requests per mode (default: %(default)s)")
+    bench_parser.add_argument("--processes", type=int, default=5, help="one-shot processes to time (default: %(default)s)")
+    bench_parser.add_argument("--concurrency", type=int, default=8, help="concurrent requests (default: %(default)s)")
+    bench_parser.set_defaults(func=bench)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    args.func(args)
@@ -0,0 +1,124 @@
+import os
+import re
+import json
+import ipaddress
+import threading
+import urllib.parse
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from verdict_cache import registrable_domain
+
+KNOWN_DOMAINS_FILE = os.getenv(
+    "KNOWN_DOMAINS_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "known_domains.json"))
+# Lexical scam score at which a URL is flagged without asking IPQS.
+SCAM_SCORE_THRESHOLD = int(os.getenv("SCAM_SCORE_THRESHOLD", "3"))
+
+# Same signals as assessMerchantUrl in Backend/src/services/phisingProtectionService.js.
+SUSPICIOUS_TLDS = (".xyz", ".top", ".tk", ".ml", ".ga", ".cf")
+SUSPICIOUS_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r"verify.*account", r"secure.*payment", r"confirm.*identity", r"update.*billing", r"\.ru/", r"\.xyz/",
+    r"\.cc/", r"unusual.*activity", r"account.*suspended", r"your.*prize", r"lottery.*winner",
+    r"urgent.*action", r"password.*reset", r"security.*breach",
+)]
+GAMBLING_WORDS = re.compile(
+    r"casino|poker|sportsbook|slots?(?![a-z])|bingo|lotter(?:y|ies)|lotto|roulette|blackjack|jackpot|betting|wager"
+    r"|(?:^|[-.])bet(?:\d|[-.]|$)")
+
+
+class Decision(NamedTuple):
+    """A local verdict: `scam` is an IPQS-shaped dict and `gambling` a bool, or None to ask remotely."""
+    scam: Optional[Dict[str, bool]]
+    gambling: Optional[bool]
+    reasons: List[str]
+
+
+class UrlPrefilter:
+    """
+    Decides the common URLs locally: exact-match sets of known safe, gambling and scam
+    registrable domains, then lexical features of the URL. Only what remains uncertain
+    needs IPQS or Gemini.
+    """
+
+    def __init__(self, safe: Iterable[str] = (), gambling: Iterable[str] = (), scam: Iterable[str] = (),
+                 scam_threshold: int = SCAM_SCORE_THRESHOLD):
+        self.safe: FrozenSet[str] = frozenset(map(registrable_domain, safe))
+        self.gambling: FrozenSet[str] = frozenset(map(registrable_domain, gambling))
+        self.scam: FrozenSet[str] = frozenset(map(registrable_domain, scam))
+        # Brand names of the safe domains, for spotting look-alikes such as paypal-secure-checkout.com.
+        self.brands: FrozenSet[str] = frozenset(
+            domain.split(".")[0] for domain in self.safe if len(domain.split(".")[0]) >= 4)
+        self.scam_threshold = scam_threshold
+        self._stats = {"urls": 0, "scam_decided": 0, "gambling_decided": 0, "fully_decided": 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str = KNOWN_DOMAINS_FILE) -> "UrlPrefilter":
+        with open(path) as f:
+            lists = json.load(f)
+        return cls(lists.get("safe", ()), lists.get("gambling", ()), lists.get("scam", ()))
+
+    def scam_score(self, url: str, host: str, domain: str) -> Tuple[int, List[str]]:
+        score = 0
+        reasons = []
+
+        def signal(points: int, reason: str):
+            nonlocal score
+            score += points
+            reasons.append(reason)
+
+        try:
+            ipaddress.ip_address(host)
+            signal(2, "IP address used as domain")
+        except ValueError:
+            pass
+        tokens = re.split(r"[.-]", host)
+        if any(token.startswith(brand) for token in tokens for brand in self.brands) and domain not in self.safe:
+            signal(2, "Imitates a well-known brand")
+        if "@" in urllib.parse.urlsplit(url).netloc:
+            signal(2, "User info in URL")
+        if host.endswith(SUSPICIOUS_TLDS):
+            signal(1, "Suspicious top-level domain")
+        if any(pattern.search(url) for pattern in SUSPICIOUS_PATTERNS):
+            signal(1, "Suspicious URL patterns detected")
+        if "xn--" in host:
+            signal(1, "Internationalized (punycode) domain")
+        if domain.count("-") >= 3 or len(host) > 50 or host.count(".") >= 5:
+            signal(1, "Unusually long or hyphenated domain")
+        return score, reasons
+
+    def classify(self, url: str) -> Decision:
+        raw = url.strip()
+        if "://" not in raw:
+            raw = "http://" + raw
+        host = (urllib.parse.urlsplit(raw).hostname or "").rstrip(".").lower()
+        domain = registrable_domain(raw)
+        if domain in self.scam:
+            decision = Decision({"unsafe": True, "phishing": True}, None, ["Known phishing domain"])
+        elif domain in self.safe:
+            decision = Decision({"unsafe": False}, False, ["Known safe domain"])
+        elif domain in self.gambling:
+            decision = Decision({"unsafe": False}, True, ["Known gambling domain"])
+        else:
+            score, reasons = self.scam_score(raw, host, domain)
+            scam = None
+            if score >= self.scam_threshold:
+                scam = {"unsafe": True, "suspicious": True}
+                if "Imitates a well-known brand" in reasons:
+                    scam["phishing"] = True
+            gambling = True if GAMBLING_WORDS.search(domain) else None
+            if gambling:
+                reasons.append("Gambling keyword in domain")
+            decision = Decision(scam, gambling, reasons)
+        with self._lock:
+            self._stats["urls"] += 1
+            self._stats["scam_decided"] += decision.scam is not None
+            self._stats["gambling_decided"] += decision.gambling is not None
+            self._stats["fully_decided"] += decision.scam is not None and decision.gambling is not None
+        return decision
+
+    def stats(self) -> Dict[str, float]:
+        """How many URLs were classified, and how many skipped each remote check."""
+        with self._lock:
+            stats: Dict[str, float] = dict(self._stats)
+        stats["short_circuit_rate"] = stats["fully_decided"] / stats["urls"] if stats["urls"] else 0.0
+        return stats
@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import sqlite3
+import ipaddress
+import threading
+import urllib.parse
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# How long a verdict stays valid, per kind. Scam reputation moves faster than a site's purpose.
+SCAM_TTL = float(os.getenv("SCAM_VERDICT_TTL", str(6 * 60 * 60)))
+GAMBLING_TTL = float(os.getenv("GAMBLING_VERDICT_TTL", str(7 * 24 * 60 * 60)))
+CACHE_SIZE = int(os.getenv("VERDICT_CACHE_SIZE", "4096"))
+# Persistent tier; set VERDICT_CACHE_DB to an empty string to keep verdicts in memory only.
+CACHE_DB = os.getenv("VERDICT_CACHE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "verdict_cache.sqlite3"))
+
+# Public suffixes with more than one label that users commonly hit; anything else is
+# treated as a single-label suffix (example.com, example.io).
+MULTI_LABEL_SUFFIXES = {
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "me.uk", "ltd.uk", "plc.uk",
+    "com.au", "net.au", "org.au", "edu.au", "gov.au",
+    "co.nz", "org.nz", "co.jp", "ne.jp", "or.jp", "co.kr", "or.kr", "co.in", "net.in", "org.in",
+    "com.br", "com.mx", "com.ar", "com.co", "com.tr", "com.cn", "com.hk", "com.tw", "com.sg",
+    "com.my", "com.ph", "com.ng", "co.za", "co.il", "com.sa", "com.ua", "com.pl",
+    "github.io", "herokuapp.com", "blogspot.com", "netlify.app", "vercel.app", "pages.dev",
+}
+
+
+def registrable_domain(url: str) -> str:
+    """
+    Normalizes a URL or bare host to its registrable domain: "https://WWW.Shop.Example.co.uk:443/x"
+    and "shop.example.co.uk" both become "example.co.uk". IP addresses are returned as-is.
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = "http://" + url
+    host = (urllib.parse.urlsplit(url).hostname or "").rstrip(".")
+    try:
+        host = host.encode("idna").decode("ascii")
+    except UnicodeError:
+        pass
+    host = host.lower()
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+    labels = host.split(".")
+    if len(labels) >= 3 and ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+class VerdictCache:
+    """
+    Scam and gambling verdicts per registrable domain: an in-memory LRU of `size` entries in
+    front of an optional SQLite file, each verdict expiring after its kind's TTL.
+    """
+
+    def __init__(self, path: Optional[str] = CACHE_DB, size: int = CACHE_SIZE,
+                 ttls: Optional[Dict[str, float]] = None, clock: Callable[[], float] = time.time):
+        self.size = max(1, size)
+        self.ttls = ttls or {"scam": SCAM_TTL, "gambling": GAMBLING_TTL}
+        self.clock = clock
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._stats = {kind: {"memory_hits": 0, "disk_hits": 0, "misses": 0} for kind in self.ttls}
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts ("
+                " kind TEXT NOT NULL, domain TEXT NOT NULL, verdict TEXT NOT NULL, expires_at REAL NOT NULL,"
+                " PRIMARY KEY (kind, domain))")
+            self._db.commit()
+
+    def _remember(self, key: Tuple[str, str], expires_at: float, verdict: Any) -> None:
+        self._memory[key] = (expires_at, verdict)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.size:
+            self._memory.popitem(last=False)
+
+    def get(self, kind: str, url: str) -> Tuple[bool, Any]:
+        """Returns (True, verdict) for a live cached verdict, else (False, None)."""
+        key = (kind, registrable_domain(url))
+        now = self.clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._memory.move_to_end(key)
+                self._stats[kind]["memory_hits"] += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._memory[key]
+            if self._db is not None:
+                row = self._db.execute("SELECT verdict, expires_at FROM verdicts WHERE kind = ? AND domain = ?",
+                                       key).fetchone()
+                if row is not None and row[1] > now:
+                    verdict = json.loads(row[0])
+                    self._remember(key, row[1], verdict)
+                    self._stats[kind]["disk_hits"] += 1
+                    return True, verdict
+            self._stats[kind]["misses"] += 1
+            return False, None
+
+    def put(self, kind: str, url: str, verdict: Any) -> None:
+        key = (kind, registrable_domain(url))
+        expires_at = self.clock() + self.ttls[kind]
+        with self._lock:
+            self._remember(key, expires_at, verdict)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO verdicts (kind, domain, verdict, expires_at) VALUES (?, ?, ?, ?)",
+                                 (*key, json.dumps(verdict), expires_at))
+                self._db.execute("DELETE FROM verdicts WHERE expires_at <= ?", (self.clock(),))
+                self._db.commit()
+
+    def get_or_check(self, kind: str, url: str, check: Callable[[str], Any],
+                     cacheable: Callable[[Any], bool] = lambda verdict: True) -> Any:
+        """Returns the cached verdict, or calls check(url) and caches its result when cacheable()."""
+        hit, verdict = self.get(kind, url)
+        if hit:
+            return verdict
+        verdict = check(url)
+        if cacheable(verdict):
+            self.put(kind, url, verdict)
+        return verdict
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit and miss counts per kind, with the overall hit rate."""
+        with self._lock:
+            stats = {kind: dict(counts) for kind, counts in self._stats.items()}
+        for counts in stats.values():
+            lookups = counts["memory_hits"] + counts["disk_hits"] + counts["misses"]
+            counts["hit_rate"] = (lookups - counts["misses"]) / lookups if lookups else 0.0
+        return stats
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the cardServer.py extraction hot paths.
+
+    python cardBench.py extract --sizes 0.1 1 5
+    python cardBench.py adversarial --sizes 10 40 160 640
+    python cardBench.py parse --sizes 0.5 2
+    python cardBench.py batch --pages 400 --size-kb 50
+    python cardBench.py suite --save-baseline    # on the known-good code
+    python cardBench.py suite                    # after a change; exits 1 on a regression
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import cardServer
+
+# Reward snippets in the shape each extractor branch expects.
+CARD_SNIPPETS = {
+    "Discover It Student Card": [
+        "Where can you get 5% cash back today? Jan - Mar 2025 Grocery Stores and Wholesale Clubs Earn 5% Cashback Bonus up to $1,500 per quarter",
+        "earn 1% cash back on all other purchases",
+    ],
+    "Chase Freedom Unlimited": [
+        "Earn 3% on dining at restaurants, including takeout and eligible delivery services.",
+        "Earn 3% on drugstore purchases.",
+        "Earn 5% on travel purchased through Chase TravelSM.",
+        "Earn 1.5% on all other purchases*",
+    ],
+    "CapitalOne Savor Card": [
+        "Earn unlimited 3% cash back on dining, entertainment, popular streaming services",
+        "Earn unlimited 5% cash back on hotels and rental cars booked through Capital One Travel",
+        "Earn unlimited 3% cash back at grocery stores",
+        "Earn unlimited 1% cash back on all other purchases",
+    ],
+    "CapitalOne Quicksilver Rewards": [
+        "Earn unlimited 1.5% cash back on every purchase",
+    ],
+    "AMEX Blue Cash Everyday Card": [
+        "3% CASH BACK On U.S. online retail purchases, up to $6,000 per year",
+        "3% CASH BACK On U.S. gas stations",
+        "4X POINTS On Restaurants worldwide",
+        "Earn 60,000 Membership Rewards ® Points",
+        "$84 back annually as a Disney Bundle statement credit",
+    ],
+}
+FILLER_WORDS = (
+    "Apply now Terms apply See rates and fees Privacy Legal Careers About us Contact "
+    "Compare cards Sign in Help Security Accessibility Site map Annual fee APR"
+).split()
+
+def synthetic_page(card_name, size_bytes, seed=0):
+    """Builds page text of roughly `size_bytes` mixing boilerplate with the card's reward snippets."""
+    rng = random.Random(seed)
+    snippets = CARD_SNIPPETS.get(card_name, CARD_SNIPPETS["AMEX Blue Cash Everyday Card"])
+    parts = []
+    size = 0
+    while size < size_bytes:
+        filler = " ".join(rng.choice(FILLER_WORDS) for _ in range(rng.randint(20, 200)))
+        snippet = rng.choice(snippets)
+        parts.append(filler)
+        parts.append(snippet)
+        size += len(filler) + len(snippet) + 2
+    return " ".join(parts)
+
+def best_time(func, repeat):
+    """Returns the fastest of `repeat` timed calls, and the last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def bench_extract(args):
+    """Compares anchor-prefiltered extraction against running every pattern over the full text."""
+    plain_registry = cardServer.load_extractor_registry(prefilter=False)
+    print(f"{'card':<32}{'size MB':>9}{'plain s':>10}{'anchored s':>12}{'speedup':>9}  same output")
+    for card_name in CARD_SNIPPETS:
+        for size_mb in args.sizes:
+            text = synthetic_page(card_name, int(size_mb * 1024 * 1024))
+            plain_seconds, plain = best_time(
+                lambda: cardServer.clean_reward_data(text, card_name, plain_registry), args.repeat)
+            anchored_seconds, anchored = best_time(
+                lambda: cardServer.clean_reward_data(text, card_name), args.repeat)
+            print(f"{card_name:<32}{size_mb:>9g}{plain_seconds:>10.4f}{anchored_seconds:>12.4f}"
+                  f"{plain_seconds / anchored_seconds:>8.2f}x  {plain == anchored}")
+
+def synthetic_html(card_name, size_bytes, seed=0):
+    """Wraps a synthetic page in nav, footer and script boilerplate, with the rewards in one region."""
+    rng = random.Random(seed)
+    boilerplate = []
+    size = 0
+    while size < size_bytes:
+        words = " ".join(rng.choice(FILLER_WORDS) for _ in range(rng.randint(5, 30)))
+        boilerplate.append(f"<div class=\"legal\"><p>{words}</p><script>track({size});</script></div>")
+        size += len(boilerplate[-1])
+    rewards = "".join(f"<li>{snippet}</li>" for snippet in CARD_SNIPPETS[card_name])
+    half = len(boilerplate) // 2
+    return ("<html><body><nav>" + "".join(boilerplate[:half]) + "</nav>"
+            f"<ul class=\"rewards\">{rewards}</ul><footer>" + "".join(boilerplate[half:]) + "</footer></body></html>")
+
+def bench_parse(args):
+    """Compares the HTML-to-text backends on whole pages against converting only the rewards region."""
+    from bs4 import BeautifulSoup
+    print(f"{'size MB':>8}{'bs4 s':>9}{'lxml s':>9}{'region s':>10}{'text KB':>9}{'region KB':>11}  same output")
+    for size_mb in args.sizes:
+        html = synthetic_html("CapitalOne Savor Card", int(size_mb * 1024 * 1024))
+        bs4_seconds, bs4_text = best_time(lambda: cardServer.html_to_text(html, "bs4"), args.repeat)
+        lxml_seconds, lxml_text = best_time(lambda: cardServer.html_to_text(html, "lxml"), args.repeat)
+        region = str(BeautifulSoup(html, "html.parser").select_one(".rewards"))
+        region_seconds, region_text = best_time(lambda: cardServer.html_to_text(region), args.repeat)
+        print(f"{size_mb:>8g}{bs4_seconds:>9.3f}{lxml_seconds:>9.3f}{region_seconds:>10.4f}"
+              f"{len(bs4_text) / 1024:>9.0f}{len(region_text) / 1024:>11.1f}  {bs4_text == lxml_text}")
+
+# Inputs that make a card's patterns backtrack, as (card, repeated unit, prefix).
+ADVERSARIAL_CASES = {
+    "dollar amounts": ("AMEX Blue Cash Everyday Card", "$5 off your order ", ""),
+    "cash back, no digits": ("AMEX Blue Cash Everyday Card", "on groceries and more ", "3% CASH BACK On "),
+    "discover quarter run": ("Discover It Student Card", "deals on 5 items ", "Where can you get 5% cash back today? "),
+}
+
+def adversarial_page(case, size_bytes):
+    """Builds an adversarial page of roughly `size_bytes` for one of ADVERSARIAL_CASES."""
+    _, unit, prefix = ADVERSARIAL_CASES[case]
+    return prefix + unit * max(1, (size_bytes - len(prefix)) // len(unit))
+
+def bench_adversarial(args):
+    """Shows guarded extraction time staying bounded on backtracking inputs as they grow."""
+    print(f"{'case':<24}{'size KB':>9}{'plain s':>10}{'guarded s':>11}  skipped patterns")
+    for case, (card_name, _, _) in ADVERSARIAL_CASES.items():
+        for size_kb in args.sizes:
+            text = adversarial_page(case, int(size_kb * 1024))
+            plain = "-"
+            if size_kb <= args.plain_max:
+                plain_seconds, _ = best_time(lambda: cardServer.clean_reward_data(text, card_name), 1)
+                plain = f"{plain_seconds:.4f}"
+            skipped = []
+            start = time.perf_counter()
+            cardServer.clean_reward_data(text, card_name, budget=args.budget, skipped=skipped)
+            guarded_seconds = time.perf_counter() - start
+            print(f"{case:<24}{size_kb:>9g}{plain:>10}{guarded_seconds:>11.4f}  {', '.join(skipped) or '-'}")
+
+def bench_batch(args):
+    """Shows batch_extract throughput as the process pool grows from 1 to N processes."""
+    max_processes = args.max_processes or os.cpu_count() or 1
+    counts = sorted({1, max_processes} | {2 ** power for power in range(max_processes.bit_length()) if 2 ** power <= max_processes})
+    card_names = list(CARD_SNIPPETS)
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        entries = [
+            cardServer.save_snapshot(card_names[number % len(card_names)], f"https://example.test/{number}", "",
+                                     synthetic_page(card_names[number % len(card_names)], args.size_kb * 1024, number),
+                                     snapshot_dir)
+            for number in range(args.pages)
+        ]
+        print(f"{'processes':>9}{'seconds':>9}{'pages/s':>9}{'speedup':>9}")
+        baseline = None
+        for processes in counts:
+            start = time.perf_counter()
+            for _ in cardServer.batch_extract(entries, processes, args.chunksize, snapshot_dir):
+                pass
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            print(f"{processes:>9}{seconds:>9.2f}{args.pages / seconds:>9.0f}{baseline / seconds:>8.2f}x")
+
+# ----- REGRESSION SUITE -----
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "card_bench_baseline.json")
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "fixtures")
+# Extractor branch -> (card whose extractor it is, recorded page in tests/fixtures).
+BRANCHES = {
+    "discover": ("Discover It Student Card", "discover_it_student.html"),
+    "chase_freedom": ("Chase Freedom Unlimited", "chase_freedom_unlimited.html"),
+    "savor": ("CapitalOne Savor Card", "capitalone_savor.html"),
+    "quicksilver": ("CapitalOne Quicksilver Rewards", "capitalone_quicksilver.html"),
+    "amex_fallback": ("AMEX Blue Cash Everyday Card", "amex_blue_cash_everyday.html"),
+}
+SUITE_SOURCES = ("synthetic", "fixture")
+SUITE_STAGES = ("html_to_text", "extract", "categorize")
+SUITE_SIZES_KB = [10, 100, 1000, 10000]
+# Peak allocations below this are compared as equal, so tiny cases do not flap.
+ALLOCATION_FLOOR_KB = 256
+# Each timed sample loops the call until it takes at least this long, as timeit's autorange does.
+MIN_SAMPLE_SECONDS = 0.05
+
+def boilerplate_text(size_bytes, seed=0):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(FILLER_WORDS) for _ in range(max(1, size_bytes // 6)))
+
+def scaled_fixture(file_name, size_bytes):
+    """
+    Returns (html, text) of roughly `size_bytes` each: the recorded page's body, and its text,
+    repeated between 2 KB runs of boilerplate.
+    """
+    with open(os.path.join(FIXTURES_DIR, file_name), encoding="utf-8") as f:
+        html = f.read()
+    body = re.search(r"<body[^>]*>(.*)</body>", html, re.DOTALL).group(1)
+    text = cardServer.html_to_text(html)
+    separator_text = f" {boilerplate_text(2048)} "
+    separator_html = f"<div class=\"legal\"><p>{separator_text}</p><script>track();</script></div>"
+    html_copies = max(1, size_bytes // (len(body) + len(separator_html)))
+    text_copies = max(1, size_bytes // (len(text) + len(separator_text)))
+    return ("<html><body>" + separator_html.join([body] * html_copies) + "</body></html>",
+            separator_text.join([text] * text_copies))
+
+def suite_inputs(branch, source, size_bytes):
+    """Returns (html, text) for one case, each of roughly `size_bytes`."""
+    card_name, file_name = BRANCHES[branch]
+    if source == "fixture":
+        return scaled_fixture(file_name, size_bytes)
+    return synthetic_html(card_name, size_bytes), synthetic_page(card_name, size_bytes)
+
+def categorize_phrases(text):
+    """Splits page text into eight-word phrases, the shape of the category strings extraction yields."""
+    words = text.split()
+    return [" ".join(words[start:start + 8]) for start in range(0, len(words), 8)]
+
+def categorize_cold(phrases):
+    cardServer.categorize_normalized.cache_clear()
+    return cardServer.standardize_categories(phrases)
+
+def sample_time(func, repeat):
+    """
+    Returns the median per-call time over `repeat` samples, each looping `func` for at least
+    MIN_SAMPLE_SECONDS. The median rather than the best, since on shared or frequency-scaling
+    machines the occasional fast sample is as unrepeatable as a slow one.
+    """
+    start = time.perf_counter()
+    func()
+    loops = max(1, int(MIN_SAMPLE_SECONDS / max(time.perf_counter() - start, 1e-9)))
+    samples = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops)
+    return statistics.median(samples)
+
+# A fixed mix of regex scanning, string building and dict work, timed next to every case so
+# a baseline recorded on a faster or busier machine still compares fairly.
+REFERENCE_TEXT = synthetic_page("AMEX Blue Cash Everyday Card", 64 * 1024, seed=99)
+REFERENCE_PATTERN = re.compile(r"(\d+)%\s+cash\s+back", re.IGNORECASE)
+
+def reference_workload():
+    counts = {}
+    for word in REFERENCE_TEXT.split():
+        counts[word.lower()] = counts.get(word.lower(), 0) + 1
+    return len(REFERENCE_PATTERN.findall(REFERENCE_TEXT)), " ".join(sorted(counts))
+
+def peak_allocation(func):
+    """Runs `func` under tracemalloc and returns the peak traced memory in bytes."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_suite(sizes_kb=SUITE_SIZES_KB, repeat=5, branches=None, sources=SUITE_SOURCES, stages=SUITE_STAGES,
+              progress=None):
+    """
+    Times each stage on each branch's synthetic and recorded pages at each size (of the stage's
+    input: HTML for html_to_text, text otherwise). Returns {"stage/branch/source/sizeKB":
+    {"seconds", "relative", "mb_per_s", "peak_kb"}}, where seconds is the median of `repeat`
+    samples (see sample_time), relative is seconds over the reference workload's time just
+    before, and peak_kb comes from a separate tracemalloc run.
+    """
+    results = {}
+    for branch in branches or BRANCHES:
+        card_name, _ = BRANCHES[branch]
+        for source in sources:
+            for size_kb in sizes_kb:
+                html, text = suite_inputs(branch, source, int(size_kb * 1024))
+                cases = {
+                    "html_to_text": (html, lambda: cardServer.html_to_text(html)),
+                    "extract": (text, lambda: cardServer.clean_reward_data(text, card_name)),
+                }
+                if "categorize" in stages:
+                    phrases = categorize_phrases(text)
+                    cases["categorize"] = (text, lambda: categorize_cold(phrases))
+                for stage in stages:
+                    data, func = cases[stage]
+                    reference_seconds = sample_time(reference_workload, repeat)
+                    seconds = sample_time(func, repeat)
+                    key = f"{stage}/{branch}/{source}/{size_kb:g}"
+                    results[key] = {
+                        "seconds": seconds,
+                        "relative": seconds / reference_seconds,
+                        "mb_per_s": len(data) / 1024 / 1024 / seconds if seconds else float("inf"),
+                        "peak_kb": peak_allocation(func) / 1024,
+                    }
+                    if progress:
+                        progress(key, results[key])
+    return results
+
+def compare_results(results, baseline, threshold):
+    """
+    Compares results against a baseline's results. A case fails when its speed relative to the
+    reference workload drops by more than `threshold` (a fraction) or its peak allocation grows
+    by more than `threshold`.
+    Returns (rows, passed) with one (key, throughput ratio, allocation ratio, status) row per case.
+    """
+    rows = []
+    passed = True
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            rows.append((key, None, None, "new"))
+            continue
+        speed = previous["relative"] / result["relative"]
+        memory = max(result["peak_kb"], ALLOCATION_FLOOR_KB) / max(previous["peak_kb"], ALLOCATION_FLOOR_KB)
+        failures = []
+        if speed < 1 - threshold:
+            failures.append("slower")
+        if memory > 1 + threshold:
+            failures.append("more memory")
+        passed = passed and not failures
+        rows.append((key, speed, memory, "FAIL (" + ", ".join(failures) + ")" if failures else "ok"))
+    return rows, passed
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "html_text_backend": cardServer.HTML_TEXT_BACKEND,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+def bench_suite(args):
+    """Runs the regression suite and saves it as the baseline, or compares it with the saved one."""
+    print(f"{'case':<44}{'seconds':>10}{'MB/s':>9}{'peak KB':>10}")
+    results = run_suite(args.sizes, args.repeat, args.branches, args.sources, args.stages,
+                        progress=lambda key, r: print(f"{key:<44}{r['seconds']:>10.4f}{r['mb_per_s']:>9.1f}"
+                                                      f"{r['peak_kb']:>10.0f}"))
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+        print(f"\nSaved {len(results)} cases to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline on the known-good code first.")
+        return 2
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    ignored = ("recorded_at",)
+    differences = {key: value for key, value in baseline.get("environment", {}).items()
+                   if key not in ignored and environment().get(key) != value}
+    if differences:
+        print(f"\nWarning: baseline was recorded with {differences}; timings may not be comparable.")
+    rows, passed = compare_results(results, baseline["results"], args.threshold)
+    print(f"\n{'case':<44}{'speed':>8}{'memory':>8}  status (threshold {args.threshold:.0%})")
+    for key, speed, memory, status in rows:
+        speed = f"{speed:.2f}x" if speed is not None else "-"
+        memory = f"{memory:.2f}x" if memory is not None else "-"
+        print(f"{key:<44}{speed:>8}{memory:>8}  {status}")
+    print("\nPASS" if passed else "\nFAIL")
+    return 0 if passed else 1
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark cardServer.py extraction hot paths.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    extract = subparsers.add_parser("extract", help="clean_reward_data on large synthetic pages")
+    extract.add_argument("--sizes", type=float, nargs="+", default=[0.1, 1, 5],
+                         help="page sizes in MB (default: %(default)s)")
+    extract.add_argument("--repeat", type=int, default=3, help="timed runs per case (default: %(default)s)")
+    extract.set_defaults(func=bench_extract)
+    adversarial = subparsers.add_parser("adversarial", help="guarded clean_reward_data on backtracking inputs")
+    adversarial.add_argument("--sizes", type=float, nargs="+", default=[10, 40, 160, 640],
+                             help="page sizes in KB (default: %(default)s)")
+    adversarial.add_argument("--budget", type=float, default=1.0,
+                             help="per-pattern budget in seconds (default: %(default)s)")
+    adversarial.add_argument("--plain-max", type=float, default=40,
+                             help="largest size in KB also timed without the guard (default: %(default)s)")
+    adversarial.set_defaults(func=bench_adversarial)
+    parse = subparsers.add_parser("parse", help="html_to_text backends and region targeting")
+    parse.add_argument("--sizes", type=float, nargs="+", default=[0.5, 2],
+                       help="page sizes in MB (default: %(default)s)")
+    parse.add_argument("--repeat", type=int, default=3, help="timed runs per case (default: %(default)s)")
+    parse.set_defaults(func=bench_parse)
+    batch = subparsers.add_parser("batch", help="batch_extract scaling across processes")
+    batch.add_argument("--pages", type=int, default=400, help="snapshots to extract (default: %(default)s)")
+    batch.add_argument("--size-kb", type=int, default=50, help="page size in KB (default: %(default)s)")
+    batch.add_argument("--chunksize", type=int, default=cardServer.BATCH_CHUNKSIZE,
+                       help="snapshots per worker task (default: %(default)s)")
+    batch.add_argument("--max-processes", type=int, default=None,
+                       help="largest pool size (default: one per CPU)")
+    batch.set_defaults(func=bench_batch)
+    suite = subparsers.add_parser("suite", help="regression suite over every branch, checked against a baseline")
+    suite.add_argument("--sizes", type=float, nargs="+", default=SUITE_SIZES_KB,
+                       help="text sizes in KB (default: %(default)s)")
+    suite.add_argument("--repeat", type=int, default=5, help="timed samples per case (default: %(default)s)")
+    suite.add_argument("--branches", nargs="+", choices=list(BRANCHES), default=None,
+                       help="extractor branches to run (default: all)")
+    suite.add_argument("--sources", nargs="+", choices=SUITE_SOURCES, default=list(SUITE_SOURCES),
+                       help="synthetic pages, recorded fixture pages, or both (default: both)")
+    suite.add_argument("--stages", nargs="+", choices=SUITE_STAGES, default=list(SUITE_STAGES),
+                       help="stages to time (default: all)")
+    suite.add_argument("--baseline", default=BASELINE_FILE, help="baseline file (default: %(default)s)")
+    suite.add_argument("--save-baseline", action="store_true", help="record this run as the baseline")
+    suite.add_argument("--threshold", type=float, default=0.25,
+                       help="allowed throughput drop or allocation growth, as a fraction (default: %(default)s)")
+    suite.set_defaults(func=bench_suite)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    sys.exit(args.func(args))
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+In-process best-card lookup over the rewards scraped by cardServer.py.
+
+    python cardLookup.py serve --port 8765
+    python cardLookup.py bench --cards 200 --queries 200000
+
+GET /best?category=Groceries&card=<name>&card=<name>   (or merchant=<text> instead of category)
+"""
+import os
+import sys
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import cardServer
+
+LOOKUP_HOST = os.getenv("LOOKUP_HOST", "127.0.0.1")
+LOOKUP_PORT = int(os.getenv("LOOKUP_PORT", "8765"))
+# How often the server re-reads the card views to pick up a finished scrape.
+LOOKUP_REFRESH_SECONDS = float(os.getenv("LOOKUP_REFRESH_SECONDS", "60"))
+# Same rule as bestCardFinder.js: only percentage rewards are ranked.
+PERCENT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)%")
+FALLBACK_CATEGORY = sys.intern(cardServer.OTHER_PURCHASES)
+
+class RewardRecord:
+    """One parsed reward. Categories are interned and lowercased for lookups."""
+
+    __slots__ = ("card_name", "category", "category_key", "reward", "reward_type", "rate", "limit")
+
+    def __init__(self, card_name, category, reward, reward_type=None, limit=None):
+        self.card_name = sys.intern(card_name)
+        self.category = sys.intern(category or "")
+        self.category_key = sys.intern(self.category.lower())
+        self.reward = reward or ""
+        self.reward_type = reward_type
+        match = PERCENT_PATTERN.search(self.reward)
+        self.rate = float(match.group(1)) if match else None
+        self.limit = parse_limit(limit)
+
+    def to_dict(self):
+        return {
+            "card_name": self.card_name,
+            "category": self.category,
+            "reward": self.reward,
+            "reward_type": self.reward_type,
+            "rate": self.rate,
+            "limit": self.limit,
+        }
+
+def parse_limit(limit):
+    """Parses a spending limit such as "1,500" into a number, or None."""
+    if limit in (None, ""):
+        return None
+    try:
+        return float(str(limit).replace(",", ""))
+    except ValueError:
+        return None
+
+class RewardIndex:
+    """
+    Rewards held per card, plus a precomputed ranking per category: rated records by rate,
+    highest first. update_card() re-ranks only the categories the card touches.
+    """
+
+    def __init__(self):
+        self.cards = {}
+        self.rankings = {}
+        self._card_signatures = {}
+        self._lock = threading.Lock()
+
+    def update_card(self, card_name, rewards):
+        """
+        Replaces a card's rewards (dicts with category, reward, reward_type, limit).
+        Returns False, without re-ranking, when they are unchanged.
+        """
+        signature = tuple(sorted((r.get("category") or "", r.get("reward") or "", str(r.get("limit")))
+                                 for r in rewards))
+        if self._card_signatures.get(card_name) == signature:
+            return False
+        records = tuple(RewardRecord(card_name, r.get("category"), r.get("reward"), r.get("reward_type"),
+                                     r.get("limit")) for r in rewards)
+        with self._lock:
+            touched = {record.category_key for record in self.cards.get(card_name, ())}
+            touched.update(record.category_key for record in records)
+            self.cards[card_name] = records
+            self._card_signatures[card_name] = signature
+            self._rerank(touched)
+        return True
+
+    def remove_card(self, card_name):
+        with self._lock:
+            records = self.cards.pop(card_name, ())
+            self._card_signatures.pop(card_name, None)
+            self._rerank({record.category_key for record in records})
+
+    def _rerank(self, category_keys):
+        for key in category_keys:
+            ranking = [record for records in self.cards.values() for record in records
+                       if record.category_key == key and record.rate is not None]
+            ranking.sort(key=lambda record: (-record.rate, record.card_name))
+            if ranking:
+                self.rankings[key] = tuple(ranking)
+            else:
+                self.rankings.pop(key, None)
+
+    def best(self, category, card_names=None):
+        """
+        Returns the highest-rate RewardRecord for `category` among `card_names` (any card when
+        None), falling back to "other purchases" when none of the cards has a rated reward in it.
+        """
+        allowed = None if card_names is None else frozenset(card_names)
+        for key in (category.lower(), FALLBACK_CATEGORY):
+            for record in self.rankings.get(key, ()):
+                if allowed is None or record.card_name in allowed:
+                    return record
+        return None
+
+    def best_for_merchant(self, merchant, card_names=None):
+        """Categorizes a merchant string with cardServer.standardize_category, then calls best()."""
+        return self.best(cardServer.standardize_category(merchant), card_names)
+
+    def refresh_from(self, card_view_collection):
+        """
+        Brings the index up to date with the per-card views written by cardServer.py, re-ranking
+        only what changed. Returns the names of the cards that changed.
+        """
+        changed = []
+        seen = set()
+        for view in card_view_collection.find({}, {"_id": 0, "name": 1, "rewards": 1}):
+            seen.add(view["name"])
+            if self.update_card(view["name"], view.get("rewards", [])):
+                changed.append(view["name"])
+        for card_name in set(self.cards) - seen:
+            self.remove_card(card_name)
+            changed.append(card_name)
+        return changed
+
+# ----- HTTP ENDPOINT -----
+class LookupHandler(BaseHTTPRequestHandler):
+    """Answers GET /best with the best card as JSON, or 404 with a message."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path != "/best" or not (query.get("category") or query.get("merchant")):
+            return self.send_json(400, {"message": "Use /best?category=<category> or /best?merchant=<merchant>."})
+        card_names = query.get("card")
+        index = self.server.index
+        if query.get("category"):
+            record = index.best(query["category"][0], card_names)
+        else:
+            record = index.best_for_merchant(query["merchant"][0], card_names)
+        if record is None:
+            return self.send_json(404, {"message": "No rewards found for your cards."})
+        self.send_json(200, record.to_dict())
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(index, host=LOOKUP_HOST, port=LOOKUP_PORT):
+    server = ThreadingHTTPServer((host, port), LookupHandler)
+    server.daemon_threads = True
+    server.index = index
+    return server
+
+def serve(args):
+    """Loads the index from MongoDB, serves lookups, and re-reads the views every LOOKUP_REFRESH_SECONDS."""
+    index = RewardIndex()
+    card_views = cardServer.get_card_view_collection()
+    print(f"Loaded {len(index.refresh_from(card_views))} cards.")
+    server = make_server(index, args.host, args.port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving best-card lookups on http://{args.host}:{server.server_address[1]}/best")
+    try:
+        while True:
+            time.sleep(args.refresh)
+            try:
+                changed = index.refresh_from(card_views)
+            except Exception as e:
+                print(f"Failed to refresh rewards: {e}")
+                continue
+            if changed:
+                print(f"Refreshed {len(changed)} cards: {', '.join(changed)}")
+    except KeyboardInterrupt:
+        print("Shutting down lookup server.")
+    finally:
+        server.shutdown()
+        cardServer.close_mongo_client()
+
+# ----- BENCHMARK -----
+BENCH_CATEGORIES = [category for category, _ in cardServer.CATEGORY_RULES] + [cardServer.OTHER_PURCHASES]
+
+def synthetic_index(card_count, seed=0):
+    """Builds an index of `card_count` cards, each rewarding a few random categories."""
+    rng = random.Random(seed)
+    index = RewardIndex()
+    for number in range(card_count):
+        categories = rng.sample(BENCH_CATEGORIES, rng.randint(1, 4)) + [cardServer.OTHER_PURCHASES]
+        index.update_card(f"Card {number}", [
+            {"category": category, "reward": f"{rng.choice([1, 1.5, 2, 3, 4, 5])}%", "limit": "1,500"}
+            for category in dict.fromkeys(categories)
+        ])
+    return index
+
+def bench(args):
+    """Times category and merchant lookups for random user card sets."""
+    rng = random.Random(1)
+    start = time.perf_counter()
+    index = synthetic_index(args.cards)
+    print(f"Built index of {args.cards} cards in {time.perf_counter() - start:.3f}s")
+    card_sets = [rng.sample(sorted(index.cards), min(args.user_cards, args.cards)) for _ in range(1000)]
+    merchants = [f"{rng.choice(['SHELL', 'WHOLE FOODS', 'NETFLIX', 'CVS PHARMACY', 'MARRIOTT HOTEL', 'ACME'])} "
+                 f"#{rng.randint(1, 500)}" for _ in range(1000)]
+    for label, lookup, arguments in (
+        ("category", index.best, BENCH_CATEGORIES),
+        ("merchant", index.best_for_merchant, merchants),
+    ):
+        start = time.perf_counter()
+        for number in range(args.queries):
+            lookup(arguments[number % len(arguments)], card_sets[number % len(card_sets)])
+        seconds = time.perf_counter() - start
+        print(f"{label:<9} {args.queries / seconds:>12,.0f} lookups/s  {seconds / args.queries * 1e6:>7.2f} us/lookup")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Best-card lookups over the scraped rewards.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="serve /best over HTTP")
+    serve_parser.add_argument("--host", default=LOOKUP_HOST, help="bind address (default: %(default)s)")
+    serve_parser.add_argument("--port", type=int, default=LOOKUP_PORT, help="port (default: %(default)s)")
+    serve_parser.add_argument("--refresh", type=float, default=LOOKUP_REFRESH_SECONDS,
+                              help="seconds between rewards refreshes (default: %(default)s)")
+    serve_parser.set_defaults(func=serve)
+    bench_parser = subparsers.add_parser("bench", help="lookup throughput on a synthetic index")
+    bench_parser.add_argument("--cards", type=int, default=200, help="cards in the index (default: %(default)s)")
+    bench_parser.add_argument("--user-cards", type=int, default=5, help="cards per user (default: %(default)s)")
+    bench_parser.add_argument("--queries", type=int, default=200000, help="lookups per kind (default: %(default)s)")
+    bench_parser.set_defaults(func=bench)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    args.func(args)
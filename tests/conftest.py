@@ -0,0 +1,76 @@
+import os
+import sys
+
+# The scraper modules live at the repository root rather than in a package, and the
+# nudge scripts import each other from Nudge/py.
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "Nudge", "py"))
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class FixtureRequestHandler(SimpleHTTPRequestHandler):
+    """Serves tests/fixtures, records each request's Cookie header, and sets a cookie on ?set_cookie=NAME."""
+
+    def end_headers(self):
+        if "?set_cookie=" in self.path:
+            name = self.path.split("?set_cookie=", 1)[1]
+            self.send_header("Set-Cookie", f"{name}=1; Path=/")
+        super().end_headers()
+
+    def do_GET(self):
+        self.server.cookie_headers.append(self.headers.get("Cookie"))
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fixture_server():
+    """A local static HTTP server over tests/fixtures. Yields (base_url, cookie_headers)."""
+    handler = functools.partial(FixtureRequestHandler, directory=FIXTURES_DIR)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.cookie_headers = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", server.cookie_headers
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def snapshot_dir(tmp_path, monkeypatch):
+    """Keeps page snapshots saved during a test out of the repository."""
+    import cardServer
+    path = str(tmp_path / "snapshots")
+    monkeypatch.setattr(cardServer, "SNAPSHOT_DIR", path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def metrics_files(tmp_path, monkeypatch):
+    """Keeps run metrics written during a test out of the repository. Returns (json_path, prom_path)."""
+    import cardServer
+    paths = (str(tmp_path / "card_metrics.json"), str(tmp_path / "card_metrics.prom"))
+    monkeypatch.setattr(cardServer, "METRICS_FILE", paths[0])
+    monkeypatch.setattr(cardServer, "METRICS_PROM_FILE", paths[1])
+    return paths
+
+
+@pytest.fixture(autouse=True)
+def message_cache(monkeypatch):
+    """Gives each test its own in-memory nudge message cache, neither pre-warmed nor saved."""
+    import generate_nudge
+    cache = generate_nudge.MessageCache(path=None)
+    monkeypatch.setattr(generate_nudge, "_message_cache", cache)
+    return cache
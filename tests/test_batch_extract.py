@@ -0,0 +1,46 @@
+import json
+
+import cardServer
+from test_write_path import FIXTURE_FOR_CARD, fixture_text
+
+
+def stored_entries(count):
+    card_names = sorted(FIXTURE_FOR_CARD)
+    return [
+        cardServer.save_snapshot(card_names[number % len(card_names)], f"https://example.test/{number}", "",
+                                 fixture_text(card_names[number % len(card_names)]) + f" page {number}")
+        for number in range(count)
+    ]
+
+
+def test_batch_extract_streams_results_in_input_order():
+    entries = stored_entries(13)
+    results = list(cardServer.batch_extract(entries, processes=2, chunksize=3))
+    assert [result["url"] for result in results] == [entry["url"] for entry in entries]
+    for entry, result in zip(entries, results):
+        text = cardServer.read_snapshot_object(entry["text"])
+        assert result["records"] == cardServer.clean_reward_data(text, entry["card_name"])
+
+
+def test_batch_extract_keeps_a_bounded_window():
+    consumed = []
+
+    def entries():
+        for entry in stored_entries(40):
+            consumed.append(entry)
+            yield entry
+
+    results = cardServer.batch_extract(entries(), processes=1, chunksize=2)
+    next(results)
+    # At most two chunks per process are read ahead of the first result.
+    assert len(consumed) <= 2 * 2
+    assert len(list(results)) == 39
+
+
+def test_backfill_writes_ndjson(tmp_path):
+    stored_entries(7)
+    output = tmp_path / "backfill.ndjson"
+    assert cardServer.backfill_snapshots(str(output), processes=2, chunksize=2) == 7
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line["url"] for line in lines] == [f"https://example.test/{number}" for number in range(7)]
+    assert all(line["records"] for line in lines)
@@ -0,0 +1,55 @@
+import pytest
+
+import cardBench
+import cardServer
+
+
+@pytest.fixture(autouse=True)
+def short_samples(monkeypatch):
+    monkeypatch.setattr(cardBench, "MIN_SAMPLE_SECONDS", 0.001)
+
+
+@pytest.mark.parametrize("branch", sorted(cardBench.BRANCHES))
+def test_scaled_fixture_contains_the_recorded_rewards(branch):
+    card_name, file_name = cardBench.BRANCHES[branch]
+    html, text = cardBench.scaled_fixture(file_name, 40 * 1024)
+    assert 30 * 1024 < len(html) <= 40 * 1024 and 30 * 1024 < len(text) <= 40 * 1024
+    with open(f"{cardBench.FIXTURES_DIR}/{file_name}", encoding="utf-8") as f:
+        recorded = cardServer.html_to_text(f.read())
+
+    def rewards(page):
+        return {(record["category"], record["reward"]) for record in cardServer.clean_reward_data(page, card_name)}
+    assert rewards(recorded) <= rewards(text)
+
+
+def test_run_suite_covers_every_stage_and_source():
+    results = cardBench.run_suite([10], repeat=1, branches=["quicksilver"])
+    assert sorted(results) == sorted(f"{stage}/quicksilver/{source}/10"
+                                     for stage in cardBench.SUITE_STAGES for source in cardBench.SUITE_SOURCES)
+    for result in results.values():
+        assert result["seconds"] > 0 and result["relative"] > 0 and result["mb_per_s"] > 0
+        assert result["peak_kb"] > 0
+
+
+def test_compare_results_flags_regressions():
+    baseline = {
+        "extract/savor/fixture/10": {"relative": 1.0, "mb_per_s": 10, "peak_kb": 100},
+        "extract/savor/fixture/1000": {"relative": 1.0, "mb_per_s": 10, "peak_kb": 1000},
+        "html_to_text/savor/fixture/10": {"relative": 1.0, "mb_per_s": 10, "peak_kb": 100},
+    }
+    results = {
+        "extract/savor/fixture/10": {"relative": 1.1, "mb_per_s": 9, "peak_kb": 200},
+        "extract/savor/fixture/1000": {"relative": 1.0, "mb_per_s": 10, "peak_kb": 2000},
+        "html_to_text/savor/fixture/10": {"relative": 2.0, "mb_per_s": 5, "peak_kb": 100},
+        "categorize/savor/fixture/10": {"relative": 1.0, "mb_per_s": 10, "peak_kb": 100},
+    }
+    rows, passed = cardBench.compare_results(results, baseline, threshold=0.25)
+    statuses = {key: status for key, _, _, status in rows}
+    assert not passed
+    assert statuses == {
+        "extract/savor/fixture/10": "ok",
+        "extract/savor/fixture/1000": "FAIL (more memory)",
+        "html_to_text/savor/fixture/10": "FAIL (slower)",
+        "categorize/savor/fixture/10": "new",
+    }
+    assert cardBench.compare_results(baseline, baseline, threshold=0.25)[1]
@@ -0,0 +1,165 @@
+import os
+import threading
+import urllib.request
+from http.cookiejar import CookieJar
+
+import pytest
+from bs4 import BeautifulSoup
+
+import cardServer
+
+
+class HttpDriver:
+    """
+    Stand-in for a Chrome WebDriver that loads pages over real HTTP with urllib and keeps
+    a browser-wide cookie jar, so the pool can be exercised without Chrome installed.
+    """
+
+    instances = []
+
+    def __init__(self):
+        self.cookies = CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+        self.page_source = ""
+        self.cdp_commands = []
+        self.dead = False
+        self.quit_called = False
+        HttpDriver.instances.append(self)
+
+    def get(self, url):
+        if self.dead:
+            # A crashed chromedriver surfaces as a connection error, not a WebDriverException.
+            raise ConnectionRefusedError("chromedriver is gone")
+        if url == "about:blank":
+            self.page_source = "<html></html>"
+            return
+        with self.opener.open(url) as response:
+            self.page_source = response.read().decode("utf-8")
+
+    def execute_cdp_cmd(self, command, params):
+        if self.dead:
+            raise ConnectionRefusedError("chromedriver is gone")
+        self.cdp_commands.append((command, params))
+        if command == "Network.clearBrowserCookies":
+            self.cookies.clear()
+
+    def execute_script(self, script, *args):
+        if "querySelectorAll" in script:
+            found = BeautifulSoup(self.page_source, "html.parser").select(args[0])
+            return [str(element) for element in found
+                    if not any(other is not element and element in other.descendants for other in found)]
+        return ["complete", 1, 1] if "readyState" in script else self.page_source
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture(autouse=True)
+def reset_instances():
+    HttpDriver.instances = []
+
+
+def test_lease_reuses_warm_driver(fixture_server):
+    base_url, _ = fixture_server
+    pool = cardServer.BrowserPool(size=1, max_pages=10, driver_factory=HttpDriver)
+    try:
+        for _ in range(3):
+            text = cardServer.get_raw_page_text(f"{base_url}/capitalone_quicksilver.html", pool)
+            assert "1.5% cash back on every purchase" in text
+    finally:
+        pool.close()
+    assert len(HttpDriver.instances) == 1
+    assert HttpDriver.instances[0].quit_called
+
+
+def test_cookies_do_not_carry_over_between_leases(fixture_server):
+    base_url, cookie_headers = fixture_server
+    pool = cardServer.BrowserPool(size=1, max_pages=10, driver_factory=HttpDriver)
+    try:
+        with pool.lease() as driver:
+            driver.get(f"{base_url}/capitalone_savor.html?set_cookie=bank_session")
+            driver.get(f"{base_url}/capitalone_savor.html")
+        assert cookie_headers[-1] == "bank_session=1"
+        with pool.lease() as driver:
+            driver.get(f"{base_url}/discover_it_student.html")
+    finally:
+        pool.close()
+    assert len(HttpDriver.instances) == 1
+    assert cookie_headers[-1] is None
+    commands = [command for command, _ in HttpDriver.instances[0].cdp_commands]
+    assert "Storage.clearDataForOrigin" in commands
+
+
+def test_driver_recycled_after_max_pages(fixture_server):
+    base_url, _ = fixture_server
+    pool = cardServer.BrowserPool(size=1, max_pages=2, driver_factory=HttpDriver)
+    try:
+        for _ in range(5):
+            cardServer.get_raw_page_text(f"{base_url}/chase_freedom_unlimited.html", pool)
+    finally:
+        pool.close()
+    assert len(HttpDriver.instances) == 3
+    assert all(driver.quit_called for driver in HttpDriver.instances)
+
+
+def test_crashed_driver_is_replaced_not_leaked(fixture_server):
+    base_url, _ = fixture_server
+    pool = cardServer.BrowserPool(size=1, max_pages=10, driver_factory=HttpDriver)
+    try:
+        with pytest.raises(ConnectionRefusedError):
+            with pool.lease() as driver:
+                driver.dead = True
+                driver.get(f"{base_url}/capitalone_savor.html")
+        assert HttpDriver.instances[0].quit_called
+
+        # With size=1 a leaked slot would block this lease forever.
+        result = {}
+        thread = threading.Thread(
+            target=lambda: result.update(text=cardServer.get_raw_page_text(f"{base_url}/capitalone_savor.html", pool)))
+        thread.start()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        assert "Earn unlimited 3% cash back" in result["text"]
+    finally:
+        pool.close()
+    assert len(HttpDriver.instances) == 2
+
+
+def test_failed_reset_discards_driver(fixture_server):
+    base_url, _ = fixture_server
+    pool = cardServer.BrowserPool(size=1, max_pages=10, driver_factory=HttpDriver)
+    try:
+        with pool.lease() as driver:
+            driver.get(f"{base_url}/capitalone_savor.html")
+            driver.dead = True
+        cardServer.get_raw_page_text(f"{base_url}/capitalone_savor.html", pool)
+    finally:
+        pool.close()
+    assert len(HttpDriver.instances) == 2
+    assert HttpDriver.instances[0].quit_called
+
+
+def test_close_quits_idle_drivers_and_rejects_new_leases(fixture_server):
+    base_url, _ = fixture_server
+    pool = cardServer.BrowserPool(size=2, max_pages=10, driver_factory=HttpDriver)
+    with pool.lease() as first, pool.lease() as second:
+        first.get(f"{base_url}/capitalone_savor.html")
+        second.get(f"{base_url}/discover_it_student.html")
+    pool.close()
+    assert len(HttpDriver.instances) == 2
+    assert all(driver.quit_called for driver in HttpDriver.instances)
+    with pytest.raises(RuntimeError):
+        with pool.lease():
+            pass
+
+
+@pytest.mark.skipif(not os.path.exists(cardServer.CHROMEDRIVER_PATH), reason="chromedriver is not installed")
+def test_real_chrome_against_fixture_server(fixture_server):
+    base_url, _ = fixture_server
+    pool = cardServer.BrowserPool(size=1, max_pages=2)
+    try:
+        text = cardServer.get_raw_page_text(
+            f"{base_url}/capitalone_quicksilver.html", pool, {"type": "text", "value": "every purchase", "timeout": 10})
+    finally:
+        pool.close()
+    assert "1.5% cash back on every purchase" in text
@@ -0,0 +1,88 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import mongomock
+import pytest
+
+import cardLookup
+import cardServer
+
+REWARDS = {
+    "Savor": [
+        {"category": "Groceries", "reward": "3%", "reward_type": "cashback_savor_grocery", "limit": None},
+        {"category": "Food Services", "reward": "3%", "reward_type": "cashback_savor", "limit": None},
+        {"category": "other purchases", "reward": "1%", "reward_type": "cashback_savor_other", "limit": None},
+    ],
+    "Amex": [
+        {"category": "Groceries", "reward": "3%", "reward_type": "cashback", "limit": "6,000"},
+        {"category": "Gas", "reward": "3%", "reward_type": "cashback", "limit": "6,000"},
+        {"category": "other purchases", "reward": "Earn 60,000 Points", "reward_type": "welcome_points"},
+    ],
+    "Quicksilver": [
+        {"category": "other purchases", "reward": "1.5%", "reward_type": "cashback_quicksilver", "limit": None},
+    ],
+}
+
+
+@pytest.fixture
+def index():
+    index = cardLookup.RewardIndex()
+    for card_name, rewards in REWARDS.items():
+        index.update_card(card_name, rewards)
+    return index
+
+
+def test_record_parses_rate_limit_and_interns_category():
+    record = cardLookup.RewardRecord("Amex", "Groceries", "3%", "cashback", "6,000")
+    assert (record.rate, record.limit, record.category_key) == (3.0, 6000.0, "groceries")
+    assert cardLookup.RewardRecord("Amex", "Groceries", "4X POINTS").rate is None
+
+
+def test_best_ranks_by_rate_within_user_cards(index):
+    assert index.best("groceries").card_name == "Amex"
+    assert index.best("Gas", ["Savor", "Quicksilver"]).card_name == "Quicksilver"
+    assert index.best("Transit", ["Savor"]).reward == "1%"
+    assert index.best("Gas", ["Unknown card"]) is None
+
+
+def test_best_for_merchant_uses_standardized_category(index):
+    assert index.best_for_merchant("SHELL OIL #1234 fuel", ["Amex", "Savor"]).category == "Gas"
+    assert index.best_for_merchant("Joe's Restaurant", ["Savor", "Quicksilver"]).card_name == "Savor"
+
+
+def test_update_card_reranks_only_on_change(index):
+    assert not index.update_card("Savor", list(reversed(REWARDS["Savor"])))
+    assert index.update_card("Savor", [{"category": "Groceries", "reward": "5%"}])
+    assert index.best("Groceries").card_name == "Savor"
+    assert index.best("Food Services") is not None and index.best("Food Services").category == "other purchases"
+
+
+def test_refresh_from_card_views_is_incremental(index):
+    db = mongomock.MongoClient().db
+    for card_name, rewards in REWARDS.items():
+        db.rewards.insert_many([dict(reward, card_name=card_name) for reward in rewards])
+    cardServer.refresh_reward_views(db.rewards, db.card_reward_views, db.category_reward_views)
+    fresh = cardLookup.RewardIndex()
+    assert sorted(fresh.refresh_from(db.card_reward_views)) == sorted(REWARDS)
+    assert fresh.refresh_from(db.card_reward_views) == []
+    db.rewards.delete_many({"card_name": "Quicksilver"})
+    cardServer.refresh_reward_views(db.rewards, db.card_reward_views, db.category_reward_views)
+    assert fresh.refresh_from(db.card_reward_views) == ["Quicksilver"]
+    assert fresh.best("other purchases").card_name == "Savor"
+
+
+def test_http_endpoint(index):
+    server = cardLookup.make_server(index, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base_url}/best?category=Gas&card=Savor&card=Quicksilver") as response:
+            assert json.load(response)["card_name"] == "Quicksilver"
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{base_url}/best?merchant=Shell&card=Nobody")
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
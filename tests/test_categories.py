@@ -0,0 +1,50 @@
+import pytest
+
+import cardServer
+
+
+@pytest.mark.parametrize("text, category", [
+    ("U.S. supermarkets and grocery stores", "Groceries"),
+    ("Grocery Stores and Wholesale Clubs", "Groceries"),
+    ("food from grocers", "Groceries"),
+    ("U.S. online retail purchases", "U.S. Online Retail Purchases"),
+    ("retail purchases made online", "U.S. Online Retail Purchases"),
+    ("U.S. gas stations", "Gas"),
+    ("fuel and streaming", "Gas"),
+    ("select U.S. streaming subscriptions", "Streaming Subscriptions"),
+    ("transit including taxis", "Transit"),
+    ("Dining at Restaurants", "Food Services"),
+    ("food delivery", "Food Services"),
+    ("Capital One Hotels", "Capital One Hotels"),
+    ("hotels and rental cars booked through Capital One Travel", "Hotels"),
+    ("restaurant at the capital one hotel", "Food Services"),
+    ("Wholesale Clubs", "Wholesale Clubs"),
+    ("Drugstore Purchases", "drugstore"),
+    ("pharmacy", "drugstore"),
+    ("All Purchases", "other purchases"),
+    ("  all ", "other purchases"),
+    ("", "other purchases"),
+    (None, "other purchases"),
+    ("entertainment", "other purchases"),
+])
+def test_standardize_category_precedence(text, category):
+    assert cardServer.standardize_category(text) == category
+
+
+def test_standardized_categories_are_fixed_points():
+    for category, _ in cardServer.CATEGORY_RULES:
+        assert cardServer.standardize_category(category) == category
+    assert cardServer.standardize_category(cardServer.OTHER_PURCHASES) == cardServer.OTHER_PURCHASES
+
+
+def test_standardize_categories_batch():
+    texts = ["Gas", "whole foods market", "Gas", "AMAZON.COM online retail", ""]
+    assert cardServer.standardize_categories(texts) == [cardServer.standardize_category(text) for text in texts]
+
+
+def test_standardize_category_is_memoized():
+    cardServer.categorize_normalized.cache_clear()
+    for _ in range(3):
+        cardServer.standardize_category("  Shell GAS #123 ")
+    info = cardServer.categorize_normalized.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
@@ -0,0 +1,137 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import google.generativeai as genai
+import pytest
+
+import checkgambling
+
+
+def is_gambling(url):
+    return any(word in url for word in ("casino", "bet", "poker"))
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    """A local generateContent endpoint answering the single and batch gambling prompts."""
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = request["contents"][0]["parts"][0]["text"]
+        self.server.prompts.append(prompt)
+        numbered = re.findall(r"^\s*(\d+)\. (\S+)$", prompt, re.MULTILINE)
+        if numbered:
+            entries = [{"id": int(number), "gambling": int(is_gambling(url))} for number, url in numbered]
+            reply = self.server.mangle(entries)
+        else:
+            url = re.search(r"following URL: (\S+)", prompt).group(1)
+            reply = "1" if is_gambling(url) else "0"
+        payload = json.dumps({"candidates": [{"content": {"parts": [{"text": reply}], "role": "model"},
+                                              "finishReason": "STOP", "index": 0}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def gemini_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGeminiHandler)
+    server.daemon_threads = True
+    server.prompts = []
+    server.mangle = json.dumps
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    checkgambling.configure_gemini(api_key="test-key", endpoint=f"http://127.0.0.1:{server.server_address[1]}")
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        genai.configure(api_key="test-key")
+
+
+URLS = ["https://casino.example.com", "https://news.example.com", "https://bet.example.net",
+        "https://shop.example.org", "https://poker.example.io"]
+
+
+def test_batch_classifies_urls_in_one_prompt(gemini_server):
+    results = checkgambling.checkgambling_batch(URLS + URLS[:2])
+    assert results == {url: is_gambling(url) for url in URLS}
+    assert len(gemini_server.prompts) == 1
+
+
+def test_batch_size_splits_prompts(gemini_server):
+    assert checkgambling.checkgambling_batch(URLS, batch_size=2) == {url: is_gambling(url) for url in URLS}
+    assert len(gemini_server.prompts) == 3
+
+
+def test_malformed_entries_fall_back_per_url(gemini_server):
+    def mangle(entries):
+        entries[1]["gambling"] = "maybe"
+        del entries[2]
+        return "```json\n" + json.dumps(entries) + "\n```"
+    gemini_server.mangle = mangle
+    assert checkgambling.checkgambling_batch(URLS) == {url: is_gambling(url) for url in URLS}
+    assert len(gemini_server.prompts) == 3
+    assert "single digit" in gemini_server.prompts[1] and URLS[1] in gemini_server.prompts[1]
+
+
+def test_unreadable_reply_falls_back_for_every_url(gemini_server):
+    gemini_server.mangle = lambda entries: "Sure! Here you go."
+    assert checkgambling.checkgambling_batch(URLS[:2]) == {url: is_gambling(url) for url in URLS[:2]}
+    assert len(gemini_server.prompts) == 3
+
+
+@pytest.mark.parametrize("reply, expected", [
+    ('{"1": 1, "2": "0"}', {"a": True, "b": False}),
+    ('[{"id": 1, "gambling": 1}, {"id": 1, "gambling": 0}, {"id": 2, "gambling": 0}]', {"b": False}),
+    ('[{"id": 3, "gambling": 1}, {"id": "x"}, 7, {"id": 2, "gambling": true}]', {"b": True}),
+    ('{"verdict": 1}', {}),
+    ('"1"', {}),
+])
+def test_parse_batch_reply(reply, expected):
+    assert checkgambling.parse_batch_reply(reply, ["a", "b"]) == expected
+
+
+def run_concurrently(batcher, urls):
+    results = {}
+    threads = [threading.Thread(target=lambda url=url: results.update({url: batcher.check(url, timeout=5)}))
+               for url in urls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_checks_are_coalesced():
+    batches = []
+
+    def classify(urls):
+        batches.append(urls)
+        return {url: is_gambling(url) for url in urls}
+
+    batcher = checkgambling.GamblingBatcher(batch_size=3, max_wait=0.2, classify=classify)
+    results = run_concurrently(batcher, URLS)
+    assert results == {url: is_gambling(url) for url in URLS}
+    assert sorted(len(batch) for batch in batches) == [2, 3]
+    assert sorted(url for batch in batches for url in batch) == sorted(URLS)
+
+    batches.clear()
+    batcher = checkgambling.GamblingBatcher(batch_size=20, max_wait=0.2, classify=classify)
+    assert run_concurrently(batcher, URLS + URLS) == {url: is_gambling(url) for url in URLS}
+    assert [sorted(batch) for batch in batches] == [sorted(URLS)]
+
+
+def test_batch_failure_reaches_every_caller():
+    def classify(urls):
+        raise RuntimeError("model unavailable")
+
+    batcher = checkgambling.GamblingBatcher(max_wait=0.01, classify=classify)
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        batcher.check(URLS[0], timeout=5)
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from checkscam import IPQS, IPQSError, make_session
+
+
+class StandInIPQSHandler(BaseHTTPRequestHandler):
+    """Answers /<key>/<url> like the IPQS URL API, replaying scripted (status, body, delay) replies."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.client_address))
+            status, body, delay = server.script.pop(0) if server.script else (200, server.default, 0)
+        time.sleep(delay)
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def ipqs_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInIPQSHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.script = []
+    server.default = {"success": True, "unsafe": True, "phishing": True, "malware": False}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def client(server, retries=2, read_timeout=2.0):
+    return IPQS(key="test-key", base_url=f"http://127.0.0.1:{server.server_address[1]}",
+                session=make_session(retries=retries, backoff=0), read_timeout=read_timeout)
+
+
+def test_checks_reuse_one_keep_alive_connection(ipqs_server):
+    ipqs = client(ipqs_server)
+    results = [ipqs.checkscam(f"https://phish{number}.example.com/login?a=b") for number in range(3)]
+    assert results == [{"unsafe": True, "phishing": True}] * 3
+    assert ipqs_server.requests[0][0] == "/test-key/https%3A%2F%2Fphish0.example.com%2Flogin%3Fa%3Db"
+    assert len({address for _, address in ipqs_server.requests}) == 1
+
+
+def test_server_errors_and_rate_limits_are_retried(ipqs_server):
+    ipqs_server.script = [(503, {}, 0), (429, {}, 0)]
+    assert client(ipqs_server).checkscam("example.com") == {"unsafe": True, "phishing": True}
+    assert len(ipqs_server.requests) == 3
+
+
+def test_retries_are_bounded(ipqs_server):
+    ipqs_server.script = [(500, {}, 0)] * 5
+    with pytest.raises(requests.exceptions.RetryError):
+        client(ipqs_server, retries=1).checkscam("example.com")
+    assert len(ipqs_server.requests) == 2
+
+
+def test_slow_reply_times_out(ipqs_server):
+    ipqs_server.script = [(200, ipqs_server.default, 1.0)]
+    start = time.perf_counter()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client(ipqs_server, retries=0, read_timeout=0.2).checkscam("example.com")
+    assert time.perf_counter() - start < 0.9
+
+
+def test_unsuccessful_reply_raises(ipqs_server):
+    ipqs_server.script = [(200, {"success": False, "message": "Invalid API key."}, 0)]
+    with pytest.raises(IPQSError, match="Invalid API key"):
+        client(ipqs_server).checkscam("example.com")
+
+
+def test_async_checks_run_concurrently(ipqs_server):
+    ipqs_server.script = [(200, ipqs_server.default, 0.3)] * 4
+    ipqs = client(ipqs_server)
+
+    async def check_all():
+        return await asyncio.gather(*(ipqs.checkscam_async(f"site{number}.example.com") for number in range(4)))
+
+    start = time.perf_counter()
+    assert asyncio.run(check_all()) == [{"unsafe": True, "phishing": True}] * 4
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,56 @@
+import time
+
+import mongomock
+import pytest
+
+import cardServer
+from cardBench import adversarial_page
+from test_write_path import FIXTURE_FOR_CARD, fixture_text, scraper  # noqa: F401
+
+DISCOVER = "Discover It Student Card"
+
+
+def backtracking_discover_page():
+    return adversarial_page("discover quarter run", 60 * 1024) + " earn 1% cash back on all other purchases"
+
+
+@pytest.mark.parametrize("card_name", sorted(FIXTURE_FOR_CARD))
+def test_guarded_output_matches_unguarded(card_name):
+    text = fixture_text(card_name)
+    skipped = []
+    assert cardServer.clean_reward_data(text, card_name, budget=5, skipped=skipped) == \
+        cardServer.clean_reward_data(text, card_name)
+    assert skipped == []
+
+
+def test_backtracking_pattern_is_skipped_within_budget():
+    skipped = []
+    start = time.perf_counter()
+    rewards = cardServer.clean_reward_data(backtracking_discover_page(), DISCOVER, budget=0.3, skipped=skipped)
+    assert time.perf_counter() - start < 3
+    assert skipped == ["discover_cashback_5"]
+    assert [record["reward"] for record in rewards] == ["1%"]
+
+
+def test_skipped_pattern_keeps_existing_records(monkeypatch):
+    db = mongomock.MongoClient().db
+    earlier = [
+        cardServer.build_reward_document(DISCOVER, "discover_cashback_5", "Groceries", "5%", "5% on groceries"),
+        cardServer.build_reward_document(DISCOVER, "discover_cashback_1", "All Purchases", "2%", "2% on all"),
+    ]
+    cardServer.write_card_records(db.rewards, db.offers, DISCOVER, earlier, [], "run-1")
+    monkeypatch.setattr(cardServer, "EXTRACTION_BUDGET", 0.3)
+    skipped = []
+    cardServer.process_card(DISCOVER, backtracking_discover_page(), db.rewards, db.offers, "run-2", skipped)
+    assert skipped == ["discover_cashback_5"]
+    assert sorted(document["reward"] for document in db.rewards.find()) == ["1%", "5%"]
+
+
+def test_card_with_skipped_pattern_is_retried(scraper, monkeypatch):  # noqa: F811
+    _, pages = scraper
+    cardServer.main(workers=2)
+    fingerprint_before = cardServer.load_fingerprints()[DISCOVER]
+    pages[DISCOVER] = backtracking_discover_page()
+    monkeypatch.setattr(cardServer, "EXTRACTION_BUDGET", 0.3)
+    cardServer.main(workers=2)
+    assert cardServer.load_fingerprints()[DISCOVER] == fingerprint_before
@@ -0,0 +1,71 @@
+import re
+
+import pytest
+
+import cardServer
+from cardBench import CARD_SNIPPETS, synthetic_page
+from test_write_path import FIXTURE_FOR_CARD, fixture_text
+
+
+@pytest.mark.parametrize("regex, literal", [
+    (r"Earn\s+unlimited", "Earn"),
+    (r"\$\d+\s+.*?statement", "$"),
+    (r"abc?d", "ab"),
+    (r"(?:ab)cd", "ab"),
+    (r"(?P<x>ab|cd)ef", ""),
+    (r"(ab)?c", ""),
+    (r"a|b", ""),
+    (r"[ab]c", ""),
+    (r"(?P<percent>\d+)%", ""),
+])
+def test_leading_literal(regex, literal):
+    assert cardServer.leading_literal(regex) == literal
+
+
+@pytest.mark.parametrize("regex, anchor", [
+    (r"(?P<percent>\d+)%\s*CASH\s+BACK", ("%", True)),
+    (r"(?P<multiplier>\d+X)\s+POINTS", ("x", True)),
+    (r"\d+%", ("%", True)),
+    (r"(\d+)?%", (None, False)),
+    (r"\d+?%", (None, False)),
+    (r"(?P<x>ab|cd)ef", (None, False)),
+])
+def test_derive_anchor(regex, anchor):
+    assert cardServer.derive_anchor(regex, re.IGNORECASE) == anchor
+
+
+def assert_same_matches(extractor, text):
+    positions = cardServer.scan_anchors(extractor, text)
+    for rp in extractor["patterns"]:
+        expected = [(m.span(), m.groupdict()) for m in rp["pattern"].finditer(text)]
+        actual = [(m.span(), m.groupdict()) for m in cardServer.iter_pattern_matches(rp, text, positions)]
+        assert actual == expected, rp["pattern"].pattern
+
+
+def test_alternation_in_leading_group_matches_like_finditer():
+    extractor = cardServer.compile_extractor({"patterns": [
+        {"type": "t", "regex": r"(?P<x>ab|cd)ef", "reward": "{x}"},
+    ]})
+    assert extractor["patterns"][0]["anchor"] is None
+    assert_same_matches(extractor, "zz cdef abef")
+
+
+@pytest.mark.parametrize("text", [
+    "12% cash back on a 3% cash back on b",
+    "1%% 5% CASH BACK On gas ١٢% CASH BACK On food",
+    "4x points on x 44X POINTS On dining 3X POINTS On travel",
+    "$5 off $10 back as a statement credit $200 after a STATEMENT CREDIT",
+    "EARN 60,000 Points earn 10 Membership Rewards ® Points",
+    "\u0131 ea\u017fy EARN 5 Points 3% CASH BACK On gas",
+])
+def test_default_patterns_match_like_finditer(text):
+    assert_same_matches(cardServer.EXTRACTORS["default"], text)
+
+
+@pytest.mark.parametrize("card_name", sorted(CARD_SNIPPETS))
+def test_registered_patterns_match_like_finditer(card_name):
+    texts = [synthetic_page(card_name, 20000, seed) for seed in range(3)]
+    if card_name in FIXTURE_FOR_CARD:
+        texts.append(fixture_text(card_name))
+    for text in texts:
+        assert_same_matches(cardServer.get_extractor(card_name), text)
@@ -0,0 +1,45 @@
+import copy
+import json
+import os
+
+import cardServer
+
+
+def test_fingerprint_ignores_whitespace_changes():
+    assert cardServer.fingerprint_page_text("Earn  3%\n cash back") == cardServer.fingerprint_page_text("Earn 3% cash back")
+    assert cardServer.fingerprint_page_text("Earn 3% cash back") != cardServer.fingerprint_page_text("Earn 4% cash back")
+
+
+def test_fingerprint_changes_when_extractor_spec_changes(monkeypatch):
+    text = "Earn unlimited 1.5% cash back on every purchase"
+    card_name = "CapitalOne Quicksilver Rewards"
+    before = cardServer.fingerprint_page_text(text, card_name)
+
+    with open(cardServer.EXTRACTORS_FILE, encoding="utf-8") as f:
+        raw = json.load(f)
+    edited = copy.deepcopy(raw)
+    edited["cards"][card_name]["patterns"][0]["regex"] += r"\.?"
+    registry = {
+        "default": cardServer.compile_extractor(raw["default"]),
+        "cards": {name: cardServer.compile_extractor(spec) for name, spec in edited["cards"].items()},
+    }
+    monkeypatch.setattr(cardServer, "EXTRACTORS", registry)
+
+    assert cardServer.fingerprint_page_text(text, card_name) != before
+    # Other cards' fingerprints are unaffected by the edit.
+    other = "Earn 3% on drugstore purchases."
+    monkeypatch.undo()
+    unchanged = cardServer.fingerprint_page_text(other, "Chase Freedom Unlimited")
+    monkeypatch.setattr(cardServer, "EXTRACTORS", registry)
+    assert cardServer.fingerprint_page_text(other, "Chase Freedom Unlimited") == unchanged
+
+
+def test_fingerprint_file_resolves_next_to_script():
+    assert os.path.dirname(cardServer.FINGERPRINT_FILE) == os.path.dirname(os.path.abspath(cardServer.__file__))
+
+
+def test_fingerprints_round_trip(tmp_path):
+    path = str(tmp_path / "fingerprints.json")
+    assert cardServer.load_fingerprints(path) == {}
+    cardServer.save_fingerprints({"Card": {"hash": "abc"}}, path)
+    assert cardServer.load_fingerprints(path) == {"Card": {"hash": "abc"}}
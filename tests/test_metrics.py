@@ -0,0 +1,80 @@
+import io
+import json
+import logging
+
+import cardServer
+from test_browser_pool import HttpDriver, reset_instances  # noqa: F401
+from test_write_path import scraper  # noqa: F401
+
+FETCH_STAGES = ["browser_lease", "page_load", "ready_wait", "page_source", "html_to_text"]
+
+
+def test_page_fetch_records_stage_spans(fixture_server):
+    base_url, _ = fixture_server
+    pool = cardServer.BrowserPool(size=1, driver_factory=HttpDriver)
+    timings = {}
+    try:
+        cardServer.get_raw_page_text(f"{base_url}/capitalone_savor.html", pool, timings=timings)
+    finally:
+        pool.close()
+    assert [span[0] for span in timings["spans"]] == FETCH_STAGES
+    assert all(start <= end for _, start, end, _ in timings["spans"])
+    assert timings["parse_seconds"] == timings["spans"][-1][2] - timings["spans"][-1][1]
+    assert pool.drivers_started == 1
+
+
+def test_run_writes_metrics_and_trace(scraper, metrics_files, tmp_path):  # noqa: F811
+    db, pages = scraper
+    pages["CapitalOne Savor Card"] = "Access denied."
+    trace_path = str(tmp_path / "trace.json")
+    statuses = cardServer.main(workers=2, trace_path=trace_path)
+
+    metrics = json.load(open(metrics_files[0]))
+    assert metrics["statuses"] == {"changed": len(statuses) - 1, "failed": 1}
+    chase = metrics["cards"]["Chase Freedom Unlimited"]
+    assert chase["status"] == "changed"
+    assert {"extract", "mongo_write", "snapshot"} <= set(chase["stages"])
+    assert chase["counters"]["rewards_written"] == db.rewards.count_documents({"card_name": "Chase Freedom Unlimited"})
+    assert metrics["cards"]["CapitalOne Savor Card"]["counters"] == {"extract_failures": 1}
+    assert "view_refresh" in metrics["stages"]
+
+    prometheus = open(metrics_files[1]).read()
+    assert "# TYPE card_scraper_stage_seconds gauge" in prometheus
+    assert 'card_scraper_cards{status="failed"} 1' in prometheus
+    assert 'card_scraper_stage_seconds{card="Chase Freedom Unlimited",stage="extract"} ' in prometheus
+
+    events = json.load(open(trace_path))["traceEvents"]
+    spans = [event for event in events if event["ph"] == "X"]
+    assert {event["name"] for event in spans} >= {"extract", "mongo_write", "view_refresh"}
+    assert all(event["dur"] >= 0 and event["ts"] >= 0 for event in spans)
+    assert {event["args"]["name"] for event in events if event["ph"] == "M"} >= {"MainThread"}
+
+
+def test_unchanged_run_counts_skips(scraper, metrics_files):  # noqa: F811
+    cardServer.main(workers=2)
+    cardServer.main(workers=2)
+    metrics = json.load(open(metrics_files[0]))
+    assert set(metrics["statuses"]) == {"unchanged"}
+    assert "extract" not in metrics["stages"]
+
+
+def test_prometheus_labels_are_escaped():
+    metrics = cardServer.RunMetrics("run")
+    metrics.add_spans('Card "A"\\B', [("extract", 0.0, 0.5, "MainThread")])
+    assert 'card="Card \\"A\\"\\\\B",stage="extract"} 0.5' in metrics.prometheus_text()
+
+
+def test_structured_log_formats():
+    stream = io.StringIO()
+    cardServer.configure_logging("json", stream=stream)
+    try:
+        cardServer.log_event("card_written", card="Chase Freedom Unlimited", rewards=3)
+        cardServer.configure_logging("text", stream=stream)
+        cardServer.log_event("fetch_failed", logging.ERROR, card="Chase Freedom Unlimited", error="")
+    finally:
+        cardServer.logger.handlers[:] = []
+        cardServer.logger.propagate = True
+    json_line, text_line = stream.getvalue().splitlines()
+    record = json.loads(json_line)
+    assert (record["event"], record["card"], record["rewards"]) == ("card_written", "Chase Freedom Unlimited", 3)
+    assert text_line.endswith('ERROR   fetch_failed card="Chase Freedom Unlimited" error=""')
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+import generate_nudge
+from nudge_messages import template_message
+from verdict_cache import VerdictCache
+
+MESSAGE = "Careful: this site was flagged."
+
+
+@pytest.fixture
+def remote(monkeypatch):
+    """Fake IPQS, gambling check and model, each sleeping for a configurable delay."""
+    delays = {"scam": 0.0, "gambling": 0.0, "model": 0.0}
+    verdicts = {"scam": {"unsafe": True, "phishing": True}, "gambling": False}
+
+    class FakeIPQS:
+        def checkscam(self, url):
+            time.sleep(delays["scam"])
+            return verdicts["scam"]
+
+    def fake_checkgambling(url):
+        time.sleep(delays["gambling"])
+        return verdicts["gambling"]
+
+    class FakeModel:
+        def __init__(self, name):
+            pass
+
+        def generate_content(self, prompt, **kwargs):
+            time.sleep(delays["model"])
+            return type("Response", (), {"text": MESSAGE})()
+
+    monkeypatch.setattr(generate_nudge, "IPQS", FakeIPQS)
+    monkeypatch.setattr(generate_nudge, "checkgambling_coalesced", fake_checkgambling)
+    monkeypatch.setattr(generate_nudge.genai, "GenerativeModel", FakeModel)
+    return delays, verdicts
+
+
+def timed_nudge(url, **kwargs):
+    start = time.perf_counter()
+    nudge = generate_nudge.generate_nudge(url, VerdictCache(path=None), **kwargs)
+    return nudge, time.perf_counter() - start
+
+
+def test_checks_run_concurrently(remote):
+    delays, _ = remote
+    delays.update(scam=0.4, gambling=0.4)
+    nudge, seconds = timed_nudge("phish.example.com")
+    assert nudge == MESSAGE
+    assert seconds < 0.7
+
+
+def test_slow_gambling_check_degrades_to_unknown(remote):
+    delays, _ = remote
+    delays["gambling"] = 3
+    nudge, seconds = timed_nudge("phish.example.com", gambling_timeout=0.2)
+    assert nudge == MESSAGE
+    assert seconds < 1
+
+
+def test_slow_scam_check_without_other_risk_gives_no_nudge(remote):
+    delays, _ = remote
+    delays["scam"] = 3
+    nudge, seconds = timed_nudge("news.example.com", scam_timeout=0.2)
+    assert nudge is None
+    assert seconds < 1
+
+
+def test_budget_bounds_the_message_call(remote):
+    delays, _ = remote
+    delays["model"] = 3
+    nudge, seconds = timed_nudge("phish.example.com", budget=0.5)
+    assert nudge == template_message("No", {"unsafe", "phishing"})
+    assert seconds < 1
+
+
+def test_late_check_still_fills_the_cache(remote):
+    delays, verdicts = remote
+    delays["gambling"] = 0.3
+    verdicts.update(scam={"unsafe": False}, gambling=True)
+    cache = VerdictCache(path=None)
+    assert generate_nudge.generate_nudge("casino.example.com", cache, gambling_timeout=0.05) is None
+    time.sleep(0.5)
+    assert cache.get("gambling", "casino.example.com") == (True, True)
+    assert generate_nudge.generate_nudge("casino.example.com", cache) == MESSAGE
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import generate_nudge
+from nudge_messages import MessageCache, message_key, nudge_combinations, template_message
+from verdict_cache import VerdictCache
+
+
+class Composer:
+    """Stands in for the model: counts calls and answers after `delay` seconds."""
+
+    def __init__(self, delay=0.0, fail_after=None):
+        self.delay = delay
+        self.fail_after = fail_after
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def __call__(self, prompt, timeout):
+        with self.lock:
+            self.prompts.append(prompt)
+            calls = len(self.prompts)
+        if self.fail_after is not None and calls > self.fail_after:
+            raise RuntimeError("model unavailable")
+        time.sleep(self.delay)
+        return f"Message {calls}."
+
+
+def test_combinations_cover_every_nudge_once():
+    keys = [message_key(status, threats) for status, threats in nudge_combinations()]
+    assert len(keys) == len(set(keys)) == 94
+    assert "Yes|" in keys and "No|" not in keys and "Unknown|" not in keys
+    assert message_key("No", {"unsafe", "phishing"}) == "No|phishing,unsafe"
+
+
+def test_concurrent_misses_share_one_model_call():
+    composer = Composer(delay=0.2)
+    cache = MessageCache(path=None, compose=composer)
+    messages = []
+    threads = [threading.Thread(target=lambda: messages.append(cache.message("No", {"phishing"}, timeout=2)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert messages == ["Message 1."] * 5
+    assert len(composer.prompts) == 1 and "Detected Security Flags: Phishing" in composer.prompts[0]
+    assert cache.message("No", {"phishing"}, timeout=0) == "Message 1."
+    assert cache.stats()["hits"] == 1 and cache.stats()["composed"] == 1
+
+
+def test_slow_model_falls_back_to_template_and_late_message_is_kept():
+    cache = MessageCache(path=None, compose=Composer(delay=0.3))
+    start = time.perf_counter()
+    assert cache.message("Yes", {"malware"}, timeout=0.05) == template_message("Yes", {"malware"})
+    assert time.perf_counter() - start < 0.2
+    time.sleep(0.5)
+    assert cache.get("Yes", {"malware"}) == "Message 1."
+
+
+def test_failed_or_empty_message_falls_back_to_template():
+    cache = MessageCache(path=None, compose=lambda prompt, timeout: "  ")
+    assert cache.message("Yes", set(), timeout=1) == template_message("Yes", set())
+    assert cache.get("Yes", set()) is None
+    cache.compose = Composer(fail_after=0)
+    assert cache.message("Unknown", {"spamming"}, timeout=1) == template_message("Unknown", {"spamming"})
+    assert cache.stats()["templates"] == 2
+
+
+def test_messages_survive_restart(tmp_path):
+    path = str(tmp_path / "nudge_messages.json")
+    cache = MessageCache(path=path, compose=Composer())
+    cache.message("No", {"unsafe", "suspicious"}, timeout=1)
+    restarted = MessageCache(path=path, compose=Composer(fail_after=0))
+    assert restarted.message("No", ["suspicious", "unsafe"], timeout=1) == "Message 1."
+
+
+def test_warm_fills_every_combination_and_stops_at_a_failure():
+    cache = MessageCache(path=None, compose=Composer())
+    cache.put("Yes", set(), "Already here.")
+    cache.warm().join(5)
+    assert cache.stats()["cached"] == 94
+    assert cache.get("Yes", set()) == "Already here."
+
+    failing = Composer(fail_after=3)
+    cache = MessageCache(path=None, compose=failing)
+    cache.warm().join(5)
+    assert len(failing.prompts) == 4 and cache.stats()["cached"] == 3
+
+
+def test_nudges_with_the_same_risks_reuse_one_message(monkeypatch):
+    class FakeIPQS:
+        def checkscam(self, url):
+            return {"unsafe": True, "phishing": True}
+
+    monkeypatch.setattr(generate_nudge, "IPQS", FakeIPQS)
+    monkeypatch.setattr(generate_nudge, "checkgambling_coalesced", lambda url: False)
+    composer = Composer()
+    messages = MessageCache(path=None, compose=composer)
+    cache = VerdictCache(path=None)
+    nudges = [generate_nudge.generate_nudge(url, cache, messages=messages)
+              for url in ("phish-one.example.com", "phish-two.example.net")]
+    assert nudges == ["Message 1.", "Message 1."]
+    assert len(composer.prompts) == 1 and "example" not in composer.prompts[0]
@@ -0,0 +1,107 @@
+import json
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import checkgambling
+import generate_nudge
+import nudge_server
+from conftest import ROOT_DIR
+from nudge_messages import MessageCache
+from verdict_cache import VerdictCache
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """A nudge server on a free port over fake IPQS, gambling and message calls. Yields (base_url, calls)."""
+    calls = {"scam": 0, "batches": [], "configure": 0}
+
+    class FakeIPQS:
+        def checkscam(self, url):
+            calls["scam"] += 1
+            if "broken" in url:
+                raise ConnectionError("IPQS unreachable")
+            return {"unsafe": True, "phishing": True} if "phish" in url else {"unsafe": False}
+
+    def classify(urls):
+        calls["batches"].append(list(urls))
+        time.sleep(0.05)
+        return {url: "casino" in url for url in urls}
+
+    def configure():
+        calls["configure"] += 1
+
+    for module in (generate_nudge, nudge_server):
+        monkeypatch.setattr(module, "IPQS", FakeIPQS)
+    monkeypatch.setattr(nudge_server, "configure_gemini", configure)
+    monkeypatch.setattr(nudge_server, "_gemini_configured", False)
+    monkeypatch.setattr(checkgambling, "_default_batcher", checkgambling.GamblingBatcher(max_wait=0.1, classify=classify))
+    monkeypatch.setattr(generate_nudge, "_verdict_cache", VerdictCache(path=None))
+    monkeypatch.setattr(generate_nudge, "_message_cache",
+                        MessageCache(path=None, compose=lambda prompt, timeout: "Careful here."))
+
+    server = nudge_server.make_server("127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", calls
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_endpoints(service):
+    base_url, calls = service
+    assert get(f"{base_url}/scam?url=phish.example.net") == (
+        200, {"url": "phish.example.net", "flags": {"unsafe": True, "phishing": True}})
+    assert get(f"{base_url}/gambling?url=casino.example.org") == (
+        200, {"url": "casino.example.org", "gambling": True})
+    assert get(f"{base_url}/nudge?url=https://login.phish.example.net/") == (
+        200, {"url": "https://login.phish.example.net/", "nudge": "Careful here."})
+    assert get(f"{base_url}/nudge?url=news.example.com") == (200, {"url": "news.example.com", "nudge": None})
+    # The nudge for phish.example.net reused the verdict the /scam request cached.
+    assert calls["scam"] == 2 and calls["configure"] == 1
+    status, health = get(f"{base_url}/health")
+    assert status == 200 and health["messages"]["cached"] == 1
+
+
+def test_bad_requests_and_failed_checks(service):
+    base_url, _ = service
+    assert get(f"{base_url}/nudge")[0] == 400
+    assert get(f"{base_url}/unknown?url=example.com")[0] == 400
+    status, body = get(f"{base_url}/scam?url=broken.example.com")
+    assert status == 502 and "IPQS unreachable" in body["message"]
+
+
+def test_concurrent_gambling_requests_share_batches(service):
+    base_url, calls = service
+    urls = [f"site{number}.example.com" for number in range(8)] + ["casino.example.org"]
+    with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+        replies = list(pool.map(lambda url: get(f"{base_url}/gambling?url={url}"), urls))
+    assert [body["gambling"] for _, body in replies] == [False] * 8 + [True]
+    assert len(calls["batches"]) < len(urls)
+    assert sorted(url for batch in calls["batches"] for url in batch) == sorted(urls)
+
+
+def test_gemini_is_imported_on_first_use():
+    script = (
+        "import sys, nudge_server, checkgambling; loaded = 'google.generativeai' in sys.modules; "
+        "checkgambling.genai.GenerativeModel; print(loaded, 'google.generativeai' in sys.modules)"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=f"{ROOT_DIR}/Nudge/py",
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ["False", "True"]
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+import cardServer
+from conftest import FIXTURES_DIR
+from test_browser_pool import HttpDriver
+
+EDGE_CASES = [
+    "<html><head><title>T</title><style>p{}</style><script>var a = '3% cash back';</script></head>"
+    "<body><!-- note --><p>a &amp; b&nbsp;c</p>tail<template><p>x</p></template>after</body></html>",
+    "<p>unclosed <b>bold <i>italic</p> more</b> text<br>line<table><tr><td>1<td>2</table>",
+    "<div>5% CASH BACK</div><div>On groceries</div> <span>®</span>",
+    "plain text only",
+    "",
+]
+
+
+@pytest.mark.parametrize("html", EDGE_CASES + [
+    open(os.path.join(FIXTURES_DIR, name), encoding="utf-8").read() for name in sorted(os.listdir(FIXTURES_DIR))
+])
+def test_lxml_backend_matches_beautifulsoup(html):
+    pytest.importorskip("lxml")
+    assert cardServer.html_to_text(html, "lxml") == cardServer.html_to_text(html, "bs4")
+
+
+def test_regions_limit_text_to_matching_subtrees(fixture_server):
+    base_url, _ = fixture_server
+    pool = cardServer.BrowserPool(size=1, driver_factory=HttpDriver)
+    try:
+        whole, regions = {}, {}
+        whole_text = cardServer.get_raw_page_text(f"{base_url}/capitalone_savor.html", pool, timings=whole)
+        text = cardServer.get_raw_page_text(f"{base_url}/capitalone_savor.html", pool, timings=regions,
+                                            regions=[".rewards", "li"])
+    finally:
+        pool.close()
+    assert "Privacy" in whole_text and "Privacy" not in text
+    assert text.startswith("Earn unlimited 3% cash back on dining")
+    assert text.count("Earn unlimited") == 4
+    assert whole["regions_found"] is None and regions["regions_found"] is True
+    assert regions["text_chars"] < whole["text_chars"]
+    assert regions["html_chars"] < whole["html_chars"]
+
+
+def test_unmatched_regions_fall_back_to_whole_page(fixture_server):
+    base_url, _ = fixture_server
+    pool = cardServer.BrowserPool(size=1, driver_factory=HttpDriver)
+    try:
+        timings = {}
+        text = cardServer.get_raw_page_text(f"{base_url}/capitalone_savor.html", pool, timings=timings,
+                                            regions=["#no-such-region"])
+    finally:
+        pool.close()
+    assert "Privacy" in text
+    assert timings["regions_found"] is False
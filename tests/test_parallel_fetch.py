@@ -0,0 +1,81 @@
+import threading
+import time
+
+import mongomock
+import pytest
+
+import cardServer
+
+
+class FakeFetcher:
+    """Replaces get_raw_page_text with a fixed delay and tracks concurrent loads per host."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak = {}
+        self.peak_total = 0
+
+    def __call__(self, url, pool=None, ready=None, timings=None, regions=None, sources=None):
+        host = cardServer.urlparse(url).hostname
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+            self.peak_total = max(self.peak_total, sum(self.active.values()))
+        time.sleep(self.delay)
+        with self.lock:
+            self.active[host] -= 1
+        if timings is not None:
+            timings.update(wait_seconds=0.0, ready_met=True, parse_seconds=0.0, html_chars=0, text_chars=0,
+                           regions_found=None)
+        return f"page for {url}"
+
+
+@pytest.fixture
+def fake_fetcher(monkeypatch):
+    fetcher = FakeFetcher(delay=0.2)
+    monkeypatch.setattr(cardServer, "get_raw_page_text", fetcher)
+    return fetcher
+
+
+def test_blocked_host_does_not_hold_workers(fake_fetcher):
+    # CARD_MAPPING lists two Amex and two Capital One cards next to each other.
+    start = time.perf_counter()
+    results = list(cardServer.fetch_pages(cardServer.CARD_MAPPING, pool=None, workers=4, per_host_limit=1))
+    elapsed = time.perf_counter() - start
+    assert len(results) == len(cardServer.CARD_MAPPING)
+    assert all(error is None for *_, error in results)
+    assert max(fake_fetcher.peak.values()) == 1
+    assert fake_fetcher.peak_total == 4
+    # Four hosts, two of them with two cards: two rounds of 0.2s at best.
+    assert elapsed < 0.55
+
+
+def test_per_host_limit_allows_same_host_parallelism(fake_fetcher):
+    list(cardServer.fetch_pages(cardServer.CARD_MAPPING, pool=None, workers=6, per_host_limit=2))
+    assert max(fake_fetcher.peak.values()) == 2
+
+
+def test_failed_card_does_not_abort_run(fake_fetcher, monkeypatch):
+    client = mongomock.MongoClient()
+    saved = {}
+    monkeypatch.setattr(cardServer, "get_mongodb_collection", lambda: client.db.rewards)
+    monkeypatch.setattr(cardServer, "get_offers_collection", lambda: client.db.offers)
+    monkeypatch.setattr(cardServer, "get_card_view_collection", lambda: client.db.card_reward_views)
+    monkeypatch.setattr(cardServer, "get_category_view_collection", lambda: client.db.category_reward_views)
+    monkeypatch.setattr(cardServer, "load_fingerprints", lambda *args: {})
+    monkeypatch.setattr(cardServer, "save_fingerprints", lambda fingerprints, *args: saved.update(fingerprints))
+    processed = []
+
+    def process_card(card_name, *args, **kwargs):
+        if card_name == "CapitalOne Savor Card":
+            raise RuntimeError("write failed")
+        processed.append(card_name)
+        return 0, 0
+
+    monkeypatch.setattr(cardServer, "process_card", process_card)
+    cardServer.main(workers=2, per_host_limit=1)
+    assert len(processed) == len(cardServer.CARD_MAPPING) - 1
+    assert "CapitalOne Savor Card" not in saved
+    assert len(saved) == len(cardServer.CARD_MAPPING) - 1
@@ -0,0 +1,36 @@
+import pytest
+
+import cardServer
+from test_write_path import scraper  # noqa: F401
+
+
+@pytest.mark.parametrize("reward, rate", [
+    ("3%", 3.0), ("1.5%", 1.5), ("4X POINTS", 4.0), ("Earn 60,000 Points", None), ("", None), (None, None),
+])
+def test_reward_rate(reward, rate):
+    assert cardServer.reward_rate(reward) == rate
+
+
+def test_views_mirror_rewards_after_run(scraper):  # noqa: F811
+    db, _ = scraper
+    cardServer.main(workers=2)
+    card_names = sorted(db.rewards.distinct("card_name"))
+    assert [view["_id"] for view in db.card_reward_views.find().sort("_id")] == card_names
+    savor = db.card_reward_views.find_one({"_id": "CapitalOne Savor Card"})
+    assert len(savor["rewards"]) == db.rewards.count_documents({"card_name": "CapitalOne Savor Card"})
+    assert sorted(view["_id"] for view in db.category_reward_views.find()) == sorted(db.rewards.distinct("category"))
+    other = db.category_reward_views.find_one({"_id": "other purchases"})
+    rates = [entry["reward_rate"] for entry in other["cards"] if entry["reward_rate"] is not None]
+    assert rates == sorted(rates, reverse=True)
+    assert len({entry["card_name"] for entry in other["cards"]}) == len(other["cards"])
+
+
+def test_views_follow_changed_cards(scraper):  # noqa: F811
+    db, pages = scraper
+    cardServer.main(workers=2)
+    pages["CapitalOne Quicksilver Rewards"] = "Earn unlimited 9% cash back on every purchase"
+    cardServer.main(workers=2)
+    quicksilver = db.card_reward_views.find_one({"_id": "CapitalOne Quicksilver Rewards"})
+    assert [entry["reward"] for entry in quicksilver["rewards"]] == ["9%"]
+    best = db.category_reward_views.find_one({"_id": "other purchases"})["cards"][0]
+    assert (best["card_name"], best["reward_rate"]) == ("CapitalOne Quicksilver Rewards", 9.0)
@@ -0,0 +1,102 @@
+import json
+import random
+import threading
+import time
+
+import mongomock
+import pytest
+
+import cardServer
+from test_parallel_fetch import fake_fetcher  # noqa: F401
+
+CARDS = ["Card A", "Card B"]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def scheduler(tmp_path, clock):
+    return cardServer.RefreshScheduler(CARDS, path=str(tmp_path / "schedule.json"), clock=clock,
+                                       rng=random.Random(0))
+
+
+def test_new_cards_are_due_immediately(scheduler):
+    assert scheduler.due() == CARDS
+
+
+def test_interval_adapts_to_page_changes(scheduler, clock):
+    for _ in range(10):
+        scheduler.record({"Card A": "changed", "Card B": "unchanged"})
+    assert scheduler.cards["Card A"]["interval"] == cardServer.REFRESH_MIN_INTERVAL
+    assert scheduler.cards["Card B"]["interval"] == cardServer.REFRESH_MAX_INTERVAL
+    delay = scheduler.cards["Card B"]["next_due"] - clock.now
+    jitter = cardServer.REFRESH_JITTER
+    assert (1 - jitter) * cardServer.REFRESH_MAX_INTERVAL <= delay <= (1 + jitter) * cardServer.REFRESH_MAX_INTERVAL
+
+
+def test_failed_card_is_retried_soon_without_changing_interval(scheduler, clock):
+    scheduler.record({"Card A": "failed"})
+    assert scheduler.cards["Card A"]["interval"] == cardServer.REFRESH_DEFAULT_INTERVAL
+    assert scheduler.cards["Card A"]["next_due"] - clock.now <= 1.1 * cardServer.REFRESH_MIN_INTERVAL
+
+
+def test_schedule_survives_restart_and_catches_up_once(scheduler, clock, tmp_path):
+    scheduler.record({"Card A": "unchanged", "Card B": "unchanged"})
+    assert scheduler.due() == []
+    clock.now += 3 * cardServer.REFRESH_MAX_INTERVAL
+    restarted = cardServer.RefreshScheduler(CARDS + ["Card C"], path=scheduler.path, clock=clock)
+    assert restarted.due() == CARDS + ["Card C"]
+    restarted.record({"Card A": "unchanged", "Card B": "unchanged", "Card C": "unchanged"})
+    assert restarted.due() == []
+    assert set(json.load(open(scheduler.path))) == {"Card A", "Card B", "Card C"}
+
+
+def test_refresh_wakes_waiting_scheduler(scheduler):
+    scheduler.record({"Card A": "unchanged", "Card B": "unchanged"})
+    threading.Timer(0.1, scheduler.refresh, args=(["Card B"],)).start()
+    start = time.perf_counter()
+    scheduler.wait()
+    assert time.perf_counter() - start < 5
+    assert scheduler.due() == ["Card B"]
+
+
+def test_control_socket_refreshes_one_card(scheduler, tmp_path):
+    scheduler.record({"Card A": "unchanged", "Card B": "unchanged"})
+    path = str(tmp_path / "control.sock")
+    server = cardServer.start_control_server(scheduler, path)
+    if server is None:
+        pytest.skip("Unix sockets are not available")
+    try:
+        assert cardServer.send_control_command("refresh Card A", path) == "ok"
+        assert cardServer.send_control_command("refresh Card Z", path) == "unknown card: Card Z"
+        status = json.loads(cardServer.send_control_command("status", path))
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert scheduler.due() == ["Card A"]
+    assert status["Card A"]["due_in"] == 0.0
+
+
+def test_main_scrapes_only_named_cards(fake_fetcher, monkeypatch):  # noqa: F811
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(cardServer, "get_mongodb_collection", lambda: client.db.rewards)
+    monkeypatch.setattr(cardServer, "get_offers_collection", lambda: client.db.offers)
+    monkeypatch.setattr(cardServer, "get_card_view_collection", lambda: client.db.card_reward_views)
+    monkeypatch.setattr(cardServer, "get_category_view_collection", lambda: client.db.category_reward_views)
+    monkeypatch.setattr(cardServer, "load_fingerprints", lambda *args: {})
+    monkeypatch.setattr(cardServer, "save_fingerprints", lambda *args: None)
+    monkeypatch.setattr(cardServer, "process_card", lambda *args, **kwargs: (1, 0))
+    statuses = cardServer.main(workers=2, card_names=["CapitalOne Savor Card"])
+    assert statuses == {"CapitalOne Savor Card": "changed"}
+    assert sum(fake_fetcher.peak.values()) == 1
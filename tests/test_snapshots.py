@@ -0,0 +1,44 @@
+import glob
+import os
+
+import cardServer
+from test_browser_pool import HttpDriver
+from test_write_path import fixture_text, scraper  # noqa: F401
+
+SAVOR = "CapitalOne Savor Card"
+
+
+def test_objects_are_content_addressed_and_compressed(snapshot_dir):
+    first = cardServer.save_snapshot(SAVOR, "https://example.test/savor", "<p>page</p>", "page")
+    second = cardServer.save_snapshot(SAVOR, "https://example.test/savor", "<p>page</p>", "page")
+    assert (first["html"], first["text"]) == (second["html"], second["text"])
+    assert len(glob.glob(os.path.join(snapshot_dir, "objects", "*", "*.gz"))) == 2
+    assert cardServer.read_snapshot_object(first["html"]) == "<p>page</p>"
+    assert cardServer.load_latest_snapshots()[SAVOR]["fetched_at"] == second["fetched_at"]
+
+
+def test_fetched_page_is_snapshotted(fixture_server):
+    base_url, _ = fixture_server
+    url = f"{base_url}/capitalone_savor.html"
+    pool = cardServer.BrowserPool(size=1, driver_factory=HttpDriver)
+    try:
+        raw_text, _ = cardServer.fetch_card_page(url, {"name": SAVOR}, pool)
+    finally:
+        pool.close()
+    entry = cardServer.load_latest_snapshots()[SAVOR]
+    assert entry["url"] == url
+    assert cardServer.read_snapshot_object(entry["text"]) == raw_text
+    assert cardServer.html_to_text(cardServer.read_snapshot_object(entry["html"])) == raw_text
+
+
+def test_replay_matches_live_extraction(scraper, monkeypatch):  # noqa: F811
+    cardServer.main(workers=2)
+
+    def no_browser(*args, **kwargs):
+        raise AssertionError("replay must not load pages")
+
+    monkeypatch.setattr(cardServer, "get_raw_page_text", no_browser)
+    results = cardServer.replay()
+    assert set(results) == {card["name"] for card in cardServer.CARD_MAPPING.values()}
+    for card_name, records in results.items():
+        assert records == cardServer.clean_reward_data(fixture_text(card_name), card_name)
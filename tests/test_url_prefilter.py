@@ -0,0 +1,84 @@
+import os
+import re
+
+import pytest
+
+import generate_nudge
+from conftest import ROOT_DIR
+from url_prefilter import UrlPrefilter
+from verdict_cache import VerdictCache
+from test_nudge_deadlines import MESSAGE, remote  # noqa: F401
+
+
+@pytest.fixture(scope="module")
+def prefilter():
+    return UrlPrefilter.from_file()
+
+
+@pytest.mark.parametrize("url, scam, gambling", [
+    ("apple.com", {"unsafe": False}, False),
+    ("https://www.betmgm.com/en/sports", {"unsafe": False}, True),
+    ("https://sports.draftkings.com/", {"unsafe": False}, True),
+    ("paypal-secure-checkout.com/login", {"unsafe": True, "phishing": True}, None),
+    ("http://192.168.1.5/verify-account/login", {"unsafe": True, "suspicious": True}, None),
+    ("https://secure-paypal-login.xyz/verify/account", {"unsafe": True, "suspicious": True, "phishing": True}, None),
+    ("https://www.royal-casino-online.net", None, True),
+    ("https://bet-now.io", None, True),
+    ("https://www.alphabet.org", None, None),
+    ("https://purchase.example.com/checkout", None, None),
+])
+def test_classify(prefilter, url, scam, gambling):
+    decision = prefilter.classify(url)
+    assert (decision.scam, decision.gambling) == (scam, gambling)
+
+
+def test_scam_list_is_seeded_from_backend_phishing_domains(prefilter):
+    path = os.path.join(ROOT_DIR, "Backend", "src", "services", "phisingProtectionService.js")
+    with open(path) as f:
+        block = re.search(r"PHISHING_DOMAINS = \[(.*?)\]", f.read(), re.DOTALL).group(1)
+    assert set(re.findall(r"'([^']+)'", block)) <= prefilter.scam
+
+
+def test_stats_count_short_circuits():
+    prefilter = UrlPrefilter(safe=["apple.com"], gambling=["betmgm.com"])
+    for url in ["apple.com", "betmgm.com", "unknown.example.com", "https://casino-royale.example"]:
+        prefilter.classify(url)
+    stats = prefilter.stats()
+    assert (stats["urls"], stats["fully_decided"], stats["gambling_decided"]) == (4, 2, 3)
+    assert stats["short_circuit_rate"] == 0.5
+
+
+def make_counting(remote_fixture, monkeypatch):
+    calls = {"scam": 0, "gambling": 0}
+    ipqs_class = generate_nudge.IPQS
+    check_gambling = generate_nudge.checkgambling_coalesced
+
+    class CountingIPQS(ipqs_class):
+        def checkscam(self, url):
+            calls["scam"] += 1
+            return super().checkscam(url)
+
+    def counting_gambling(url):
+        calls["gambling"] += 1
+        return check_gambling(url)
+
+    monkeypatch.setattr(generate_nudge, "IPQS", CountingIPQS)
+    monkeypatch.setattr(generate_nudge, "checkgambling_coalesced", counting_gambling)
+    return calls
+
+
+@pytest.mark.parametrize("url, nudge", [
+    ("https://www.apple.com/iphone", None),
+    ("https://www.betmgm.com", MESSAGE),
+    ("https://appleid-verification.com/login", MESSAGE),
+])
+def test_decided_urls_make_no_remote_checks(remote, monkeypatch, prefilter, url, nudge):  # noqa: F811
+    calls = make_counting(remote, monkeypatch)
+    assert generate_nudge.generate_nudge(url, VerdictCache(path=None), prefilter=prefilter) == nudge
+    assert calls == {"scam": 0, "gambling": 0}
+
+
+def test_uncertain_urls_escalate(remote, monkeypatch, prefilter):  # noqa: F811
+    calls = make_counting(remote, monkeypatch)
+    generate_nudge.generate_nudge("https://news.example.com", VerdictCache(path=None), prefilter=prefilter)
+    assert calls == {"scam": 1, "gambling": 1}
@@ -0,0 +1,107 @@
+import pytest
+
+import generate_nudge
+from verdict_cache import VerdictCache, registrable_domain
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize("url, domain", [
+    ("https://WWW.Example.com:8443/path?q=1", "example.com"),
+    ("example.com", "example.com"),
+    ("login.shop.example.co.uk/", "example.co.uk"),
+    ("http://user@casino.example.com.au.", "example.com.au"),
+    ("https://someone.github.io/page", "someone.github.io"),
+    ("http://192.168.0.1/login", "192.168.0.1"),
+    ("https://bücher.de", "xn--bcher-kva.de"),
+])
+def test_registrable_domain(url, domain):
+    assert registrable_domain(url) == domain
+
+
+def test_verdict_kinds_expire_separately():
+    clock = Clock()
+    cache = VerdictCache(path=None, ttls={"scam": 60, "gambling": 3600}, clock=clock)
+    cache.put("scam", "https://example.com/a", {"unsafe": False})
+    cache.put("gambling", "example.com", False)
+    clock.now += 120
+    assert cache.get("scam", "www.example.com") == (False, None)
+    assert cache.get("gambling", "https://example.com/b") == (True, False)
+
+
+def test_least_recently_used_domain_is_evicted():
+    cache = VerdictCache(path=None, size=2)
+    cache.put("gambling", "a.com", False)
+    cache.put("gambling", "b.com", True)
+    cache.get("gambling", "a.com")
+    cache.put("gambling", "c.com", False)
+    assert cache.get("gambling", "b.com") == (False, None)
+    assert cache.get("gambling", "a.com") == (True, False)
+
+
+def test_verdicts_survive_restart(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "verdicts.sqlite3")
+    cache = VerdictCache(path=path, clock=clock)
+    cache.put("scam", "phish.example.net", {"unsafe": True, "phishing": True})
+    cache.close()
+    restarted = VerdictCache(path=path, clock=clock)
+    assert restarted.get("scam", "https://phish.example.net/login") == (True, {"unsafe": True, "phishing": True})
+    assert restarted.get("scam", "https://phish.example.net/login") == (True, {"unsafe": True, "phishing": True})
+    stats = restarted.stats()["scam"]
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+    clock.now += restarted.ttls["scam"] + 1
+    assert restarted.get("scam", "phish.example.net") == (False, None)
+
+
+class FakeModel:
+    def __init__(self, name):
+        pass
+
+    def generate_content(self, prompt, **kwargs):
+        return type("Response", (), {"text": "Careful: this looks like a gambling site."})()
+
+
+@pytest.fixture
+def nudge_checks(monkeypatch):
+    calls = {"scam": 0, "gambling": 0}
+    replies = {"gambling": True}
+
+    class FakeIPQS:
+        def checkscam(self, url):
+            calls["scam"] += 1
+            return {"unsafe": False}
+
+    def fake_checkgambling(url):
+        calls["gambling"] += 1
+        return replies["gambling"]
+
+    monkeypatch.setattr(generate_nudge, "IPQS", FakeIPQS)
+    monkeypatch.setattr(generate_nudge, "checkgambling_coalesced", fake_checkgambling)
+    monkeypatch.setattr(generate_nudge.genai, "GenerativeModel", FakeModel)
+    return calls, replies
+
+
+def test_repeat_visit_makes_no_checks(nudge_checks):
+    calls, _ = nudge_checks
+    cache = VerdictCache(path=None)
+    first = generate_nudge.generate_nudge("https://www.casino.example.com/slots", cache)
+    second = generate_nudge.generate_nudge("casino.example.com/poker", cache)
+    assert first == second == "Careful: this looks like a gambling site."
+    assert calls == {"scam": 1, "gambling": 1}
+    assert cache.stats()["gambling"]["hit_rate"] == 0.5
+
+
+def test_failed_gambling_check_is_not_cached(nudge_checks):
+    calls, replies = nudge_checks
+    cache = VerdictCache(path=None)
+    replies["gambling"] = "Something prolly went wrong"
+    generate_nudge.generate_nudge("example.org", cache)
+    generate_nudge.generate_nudge("example.org", cache)
+    assert calls == {"scam": 1, "gambling": 2}
@@ -0,0 +1,97 @@
+import os
+
+import mongomock
+import pytest
+from bs4 import BeautifulSoup
+
+import cardServer
+from conftest import FIXTURES_DIR
+
+FIXTURE_FOR_CARD = {
+    "AMEX Blue Cash Everyday Card": "amex_blue_cash_everyday.html",
+    "AMEX Blue Cash Preferred Card": "amex_blue_cash_everyday.html",
+    "CapitalOne Savor Card": "capitalone_savor.html",
+    "CapitalOne Quicksilver Rewards": "capitalone_quicksilver.html",
+    "Discover It Student Card": "discover_it_student.html",
+    "Chase Freedom Unlimited": "chase_freedom_unlimited.html",
+}
+
+
+def fixture_text(card_name):
+    with open(os.path.join(FIXTURES_DIR, FIXTURE_FOR_CARD[card_name]), encoding="utf-8") as f:
+        return BeautifulSoup(f.read(), "html.parser").get_text(" ", strip=True)
+
+
+@pytest.fixture
+def scraper(monkeypatch, tmp_path):
+    """Runs main() against mongomock, serving each card's fixture text (overridable per card)."""
+    client = mongomock.MongoClient()
+    pages = {card["name"]: fixture_text(card["name"]) for card in cardServer.CARD_MAPPING.values()}
+
+    def get_raw_page_text(url, pool=None, ready=None, timings=None, regions=None, sources=None):
+        if timings is not None:
+            timings.update(wait_seconds=0.0, ready_met=True, parse_seconds=0.0, html_chars=0, text_chars=0,
+                           regions_found=None)
+        return pages[cardServer.CARD_MAPPING[url]["name"]]
+
+    monkeypatch.setattr(cardServer, "get_raw_page_text", get_raw_page_text)
+    monkeypatch.setattr(cardServer, "get_mongodb_collection", lambda: client.db.rewards)
+    monkeypatch.setattr(cardServer, "get_offers_collection", lambda: client.db.offers)
+    monkeypatch.setattr(cardServer, "get_card_view_collection", lambda: client.db.card_reward_views)
+    monkeypatch.setattr(cardServer, "get_category_view_collection", lambda: client.db.category_reward_views)
+    monkeypatch.setattr(cardServer, "FINGERPRINT_FILE", str(tmp_path / "fingerprints.json"))
+    return client.db, pages
+
+
+def ids(collection, card_name=None):
+    query = {"card_name": card_name} if card_name else {}
+    return sorted(str(document["_id"]) for document in collection.find(query))
+
+
+def test_repeated_run_keeps_document_ids(scraper):
+    db, _ = scraper
+    cardServer.main(workers=2)
+    first_rewards, first_offers = ids(db.rewards), ids(db.offers)
+    assert first_rewards and first_offers
+    cardServer.main(workers=2, force=True)
+    assert ids(db.rewards) == first_rewards
+    assert ids(db.offers) == first_offers
+
+
+def test_stale_records_deleted_per_card(scraper):
+    db, pages = scraper
+    cardServer.main(workers=2)
+    chase_before = ids(db.rewards, "Chase Freedom Unlimited")
+    pages["CapitalOne Quicksilver Rewards"] = "Earn unlimited 2% cash back on every purchase"
+    cardServer.main(workers=2)
+    quicksilver = list(db.rewards.find({"card_name": "CapitalOne Quicksilver Rewards"}))
+    assert [document["reward"] for document in quicksilver] == ["2%"]
+    assert ids(db.rewards, "Chase Freedom Unlimited") == chase_before
+
+
+def test_empty_extraction_keeps_records_and_fingerprint(scraper):
+    db, pages = scraper
+    cardServer.main(workers=2)
+    savor_before = ids(db.rewards, "CapitalOne Savor Card")
+    fingerprint_before = cardServer.load_fingerprints()["CapitalOne Savor Card"]
+    pages["CapitalOne Savor Card"] = "Access denied. Please verify you are a human."
+    cardServer.main(workers=2)
+    assert ids(db.rewards, "CapitalOne Savor Card") == savor_before
+    assert cardServer.load_fingerprints()["CapitalOne Savor Card"] == fingerprint_before
+
+
+def test_skipped_cards_keep_their_records(scraper):
+    db, _ = scraper
+    cardServer.main(workers=2)
+    before = {document["_id"]: document["run_id"] for document in db.rewards.find()}
+    cardServer.main(workers=2)
+    after = {document["_id"]: document["run_id"] for document in db.rewards.find()}
+    assert after == before
+
+
+def test_write_card_records_falls_back_without_sessions():
+    db = mongomock.MongoClient().db
+    documents = [cardServer.build_reward_document("Card", "cashback", "Gas", "3%", "3% on gas")]
+    cardServer.write_card_records(db.rewards, db.offers, "Card", documents, [], "run-1")
+    cardServer.write_card_records(db.rewards, db.offers, "Card", documents, [], "run-2")
+    assert [document["run_id"] for document in db.rewards.find()] == ["run-2"]